@@ -0,0 +1,170 @@
+"""
+Multi-core planning for very large texts and for whole directories of jobs.
+
+Seeded plans are made of pieces that end at a sentence end, each with its
+own RNG stream (see human_typer.PLAN_PIECE_CHARS and piece_seed()), so the
+pieces can be planned on separate processes and stitched back together into
+exactly the plan a serial run with the same seed makes. A directory batch
+feeds the pieces of all its files through one process pool, so small files
+and huge ones keep every core busy alike.
+
+  plan_parallel(text, seed=7, jobs=8)      One text, pieces across processes
+  plan_batch(paths, out_dir, seed=7)       Every file to a session file (--replay)
+"""
+
+import multiprocessing
+import os
+import random
+from collections import deque
+
+from human_typer import PLAN_PIECE_CHARS, KeystrokePlan, iter_chunks, plan_piece, prepare_text, split_pieces
+
+# Pieces handed to the pool ahead of the one being stitched, per worker process
+PIPELINE_PER_JOB = 4
+
+_timing = None  # Worker copy of the timing model, sent once per process
+
+
+def _init_worker(timing):
+    global _timing
+    _timing = timing
+
+
+def _plan_piece_task(task):
+    piece, prev_char, next_char, seed, index, wpm, error_rate = task
+    plan = plan_piece(piece, prev_char, next_char, seed, index, wpm, error_rate, _timing)
+    return plan.keys.tobytes(), plan.actions.tobytes(), plan.delays.tobytes()
+
+
+def _piece_tasks(text, seed, wpm, error_rate):
+    for index, (start, end) in enumerate(split_pieces(text)):
+        yield (text[start:end], text[start - 1] if start else '', text[end] if end < len(text) else None,
+               seed, index, wpm, error_rate)
+
+
+def _ordered_results(pool, tasks, window):
+    """
+    Run (tag, task) pairs on pool with at most window in flight, so memory stays bounded;
+    yields (tag, result) in task order.
+    """
+    pending = deque()
+    for tag, task in tasks:
+        pending.append((tag, pool.apply_async(_plan_piece_task, (task,))))
+        if len(pending) >= window:
+            tag, result = pending.popleft()
+            yield tag, result.get()
+    while pending:
+        tag, result = pending.popleft()
+        yield tag, result.get()
+
+
+def _extend(plan, result):
+    keys, actions, delays = result
+    plan.keys.frombytes(keys)
+    plan.actions.frombytes(actions)
+    plan.delays.frombytes(delays)
+
+
+def _meta(wpm, error_rate, suppress_indent, seed, timing):
+    meta = {'wpm': wpm, 'error_rate': error_rate, 'suppress_indent': bool(suppress_indent),
+            'seed': seed, 'vectorized': False}
+    if timing:
+        meta['timing'] = timing.digest
+    return meta
+
+
+def _open_pool(jobs, timing):
+    return multiprocessing.Pool(jobs, initializer=_init_worker, initargs=(timing,))
+
+
+def plan_parallel(text, wpm=60, error_rate=0.06, suppress_indent=False, seed=None, timing=None, jobs=None):
+    """
+    Same as plan_keystrokes(text, seed=seed) (an unseeded call gets a random seed,
+    kept in the plan's meta), with the plan pieces spread over jobs processes.
+    text: A str, file-like object or iterable of str chunks.
+    jobs: Worker processes (default: one per CPU).
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    if not isinstance(text, str):
+        text = ''.join(iter_chunks(text))
+    text = prepare_text(text, suppress_indent)
+    jobs = jobs or os.cpu_count() or 1
+
+    plan = KeystrokePlan(_meta(wpm, error_rate, suppress_indent, seed, timing))
+    tasks = _piece_tasks(text, seed, wpm, error_rate)
+    if jobs == 1 or len(text) <= PLAN_PIECE_CHARS:
+        _init_worker(timing)
+        for task in tasks:
+            _extend(plan, _plan_piece_task(task))
+        return plan
+
+    with _open_pool(jobs, timing) as pool:
+        for _, result in _ordered_results(pool, ((None, task) for task in tasks), jobs * PIPELINE_PER_JOB):
+            _extend(plan, result)
+    return plan
+
+
+def file_seed(run_seed, path):
+    """Independent, reproducible seed for one file of a batch seeded with run_seed."""
+    return random.Random(f'{run_seed}:{os.path.basename(path)}').getrandbits(64)
+
+
+def session_path(out_dir, path):
+    """Session file of path in out_dir: the whole file name plus .hts, so a.txt and a.md don't collide."""
+    return os.path.join(out_dir, os.path.basename(path) + '.hts')
+
+
+def plan_batch(paths, out_dir, wpm=60, error_rate=0.06, suppress_indent=False, seed=None, timing=None, jobs=None,
+               on_done=None):
+    """
+    Plan every file in paths and save each plan as a session file in out_dir
+    (see session_path(); type it later with --replay). All pieces of all files
+    go through one pool; each file gets file_seed(seed, path), or a random seed
+    without one, so every plan is reproducible from its meta. Empty files are skipped.
+    on_done: Optional fn(path, plan) called as each file's plan is saved.
+    Returns the number of keystrokes planned. Raises ValueError, before planning
+    anything, if two paths would be saved to the same session file.
+    """
+    paths = list(paths)
+    seen = {}
+    for path in paths:
+        out = session_path(out_dir, path)
+        if out in seen:
+            raise ValueError(f"{seen[out]} and {path} would both be saved to {out}")
+        seen[out] = path
+
+    jobs = jobs or os.cpu_count() or 1
+    os.makedirs(out_dir, exist_ok=True)
+
+    files = []  # (path, seed) by index, appended as each file is read
+
+    def tasks():
+        for index, path in enumerate(paths):
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                text = prepare_text(f.read(), suppress_indent)
+            files.append((path, file_seed(seed, path) if seed is not None else random.randrange(2 ** 32)))
+            for task in _piece_tasks(text, files[index][1], wpm, error_rate):
+                yield index, task
+
+    def finish(index, plan):
+        path = files[index][0]
+        plan.save(session_path(out_dir, path))
+        if on_done:
+            on_done(path, plan)
+
+    total = 0
+    current = None  # (file index, plan being stitched); pieces come back in order, file after file
+    with _open_pool(jobs, timing) as pool:
+        for index, result in _ordered_results(pool, tasks(), jobs * PIPELINE_PER_JOB):
+            if current is None or current[0] != index:
+                if current:
+                    finish(*current)
+                path, this_seed = files[index]
+                current = (index, KeystrokePlan(dict(_meta(wpm, error_rate, suppress_indent, this_seed, timing),
+                                                     source=os.path.basename(path))))
+            _extend(current[1], result)
+            total += len(result[1])
+        if current:
+            finish(*current)
+    return total
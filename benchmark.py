@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Human Typer - Engine benchmark suite.
+Runs headless: keys go to a null/recording backend and, except for the
+scheduler and stop checks, a virtual clock, so nothing is typed and nothing sleeps.
+
+Reports, for every WPM x error-rate setting:
+  - planner throughput (chars/s), scalar and NumPy (if installed)
+  - executor overhead per key (µs)
+  - achieved WPM vs target (from the recorded virtual timeline)
+  - inter-key interval distribution (p10 / p50 / p90 / p99)
+and once per run, the real-clock scheduler error (recorded vs planned time),
+the stop latency (Stop pressed mid-session until execute_plan() returns)
+against a budget, and the startup cost of `import human_typer` (python -X importtime) against
+a budget; heavy optional modules (pyautogui, numpy, ...) must not load.
+
+Usage:
+  python3 benchmark.py                            # Print results
+  python3 benchmark.py --save bench.json          # Save results as a baseline
+  python3 benchmark.py --compare bench.json       # Exit 1 on a regression vs baseline
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import human_typer
+from keystroke_backends import NullBackend, RecordingBackend
+
+SAMPLE_PROSE = (
+    "The quick brown fox jumps over the lazy dog. Typing like a human means "
+    "hesitating, speeding up on familiar letter pairs and fixing mistakes! "
+    "Is that realistic? We think so.\n"
+)
+
+# Cumulative import time of human_typer allowed, in milliseconds
+STARTUP_BUDGET_MS = 100
+
+# Time allowed from setting the stop event until execute_plan() returns, in milliseconds
+STOP_BUDGET_MS = 20
+
+# Modules that must only load on first use, never on import
+LAZY_MODULES = ('pyautogui', 'numpy', 'customtkinter', 'ctypes', 'keyboard', 'pynput', 'json', 're')
+
+WPM_GRID = (40, 80, 150)
+ERROR_RATE_GRID = (0.0, 0.06, 0.15)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def sample_text(size):
+    """Mix of prose and this repo's own source code, about size characters."""
+    with open(human_typer.__file__, 'r', encoding='utf-8') as f:
+        code = f.read()
+    unit = SAMPLE_PROSE * 20 + code
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def time_call(fn, repeat):
+    """Best wall time of fn() over repeat runs, plus its last result."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_setting(text, wpm, error_rate, repeat):
+    """Benchmark one (wpm, error_rate) setting."""
+    result = {'wpm': wpm, 'error_rate': error_rate}
+
+    plan_time, plan = time_call(lambda: human_typer.plan_keystrokes(text, wpm, error_rate, seed=1), repeat)
+    result['plan_chars_per_s'] = len(text) / plan_time
+
+    try:
+        vec_time, _ = time_call(lambda: human_typer.plan_keystrokes_vectorized(text, wpm, error_rate, seed=1), repeat)
+        result['plan_vec_chars_per_s'] = len(text) / vec_time
+    except ImportError:
+        result['plan_vec_chars_per_s'] = None
+
+    exec_time, _ = time_call(
+        lambda: human_typer.execute_plan(plan, backend=NullBackend(), clock=human_typer.VirtualClock()), repeat)
+    result['exec_us_per_key'] = exec_time / len(plan) * 1e6
+
+    clock = human_typer.VirtualClock()
+    recorder = RecordingBackend(clock=clock.now)
+    typed = human_typer.execute_plan(plan, backend=recorder, clock=clock)
+    stamps = [t for t, _, _ in recorder.events]
+    elapsed = stamps[-1] - stamps[0] + plan.delays[-1]
+    result['achieved_wpm'] = (typed / 5) / (elapsed / 60)
+
+    intervals = sorted((b - a) * 1000 for a, b in zip(stamps, stamps[1:]))
+    for pct in (10, 50, 90, 99):
+        result[f'interval_p{pct}_ms'] = percentile(intervals, pct)
+
+    return result
+
+
+def bench_scheduler(keys, interval):
+    """
+    Run a fixed-interval plan on the real clock and measure how far each
+    recorded key lands from its planned deadline.
+    """
+    plan = human_typer.KeystrokePlan()
+    for _ in range(keys):
+        plan.append('x', human_typer.ACTION_TYPE, interval)
+
+    recorder = RecordingBackend()
+    start = time.perf_counter()
+    human_typer.execute_plan(plan, backend=recorder)
+    errors = sorted(abs(t - (start + n * interval)) * 1000 for n, (t, _, _) in enumerate(recorder.events))
+    return {
+        'keys': keys,
+        'interval_ms': interval * 1000,
+        'error_p50_ms': percentile(errors, 50),
+        'error_p99_ms': percentile(errors, 99),
+        'error_max_ms': errors[-1],
+    }
+
+
+def bench_stop(runs=5, interval=0.25):
+    """
+    Run a long plan on the null backend with the real clock, set the stop event
+    from another thread at varying points mid-wait and measure how long
+    execute_plan() takes to return.
+    """
+    plan = human_typer.KeystrokePlan()
+    for _ in range(10_000):
+        plan.append('x', human_typer.ACTION_TYPE, interval)
+
+    latencies = []
+    for n in range(runs):
+        stop_event = threading.Event()
+        stopped_at = []
+
+        def press_stop():
+            stopped_at.append(time.perf_counter())
+            stop_event.set()
+
+        timer = threading.Timer(0.1 + interval * n / runs, press_stop)
+        timer.start()
+        human_typer.execute_plan(plan, stop_event, backend=NullBackend())
+        latencies.append((time.perf_counter() - stopped_at[0]) * 1000)
+        timer.join()
+    return {'runs': runs, 'latency_max_ms': max(latencies), 'budget_ms': STOP_BUDGET_MS}
+
+
+def bench_startup(runs=5):
+    """
+    Import human_typer in fresh interpreters under -X importtime.
+    Returns the best cumulative import time (ms) and any LAZY_MODULES that got imported.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = float('inf')
+    eager = set()
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import human_typer'],
+                              cwd=here, capture_output=True, text=True)
+        for line in proc.stderr.splitlines():
+            # "import time: self [us] | cumulative | imported package"
+            parts = line.split('|')
+            if len(parts) != 3 or not parts[1].strip().isdigit():
+                continue
+            name = parts[2].strip()
+            if name == 'human_typer':
+                best = min(best, int(parts[1]) / 1000)
+            elif name.split('.')[0] in LAZY_MODULES:
+                eager.add(name.split('.')[0])
+    return {'import_ms': best, 'budget_ms': STARTUP_BUDGET_MS, 'eager_modules': sorted(eager)}
+
+
+def print_results(results):
+    print(f"\n{'='*100}")
+    print(f"  HUMAN TYPER — ENGINE BENCHMARK ({results['text_chars']} chars)")
+    print(f"{'='*100}")
+    print(f"  {'WPM':>4} {'ERR':>5} | {'plan c/s':>10} {'numpy c/s':>10} | {'exec µs/key':>11} | "
+          f"{'achieved':>8} | {'p10':>6} {'p50':>6} {'p90':>6} {'p99':>7} ms")
+    for r in results['settings']:
+        vec = f"{r['plan_vec_chars_per_s']:>10.0f}" if r['plan_vec_chars_per_s'] else f"{'n/a':>10}"
+        print(f"  {r['wpm']:>4} {r['error_rate']:>5.2f} | {r['plan_chars_per_s']:>10.0f} {vec} | "
+              f"{r['exec_us_per_key']:>11.2f} | {r['achieved_wpm']:>8.1f} | "
+              f"{r['interval_p10_ms']:>6.0f} {r['interval_p50_ms']:>6.0f} "
+              f"{r['interval_p90_ms']:>6.0f} {r['interval_p99_ms']:>7.0f}")
+    s = results['scheduler']
+    print(f"\n  Scheduler ({s['keys']} keys @ {s['interval_ms']:.0f}ms, real clock): "
+          f"error p50 {s['error_p50_ms']:.3f}ms | p99 {s['error_p99_ms']:.3f}ms | max {s['error_max_ms']:.3f}ms")
+    st = results['startup']
+    eager = ', '.join(st['eager_modules']) or 'none'
+    print(f"  Startup: import human_typer {st['import_ms']:.1f}ms (budget {st['budget_ms']}ms) | "
+          f"eagerly imported heavy modules: {eager}")
+    s = results['stop']
+    print(f"  Stop: execute_plan() returned {s['latency_max_ms']:.2f}ms after stop at worst "
+          f"({s['runs']} runs, budget {s['budget_ms']}ms)")
+
+
+def check_startup(startup):
+    """Return startup problems independent of any baseline."""
+    problems = []
+    if startup['import_ms'] > startup['budget_ms']:
+        problems.append(f"import human_typer took {startup['import_ms']:.1f}ms > budget {startup['budget_ms']}ms")
+    for name in startup['eager_modules']:
+        problems.append(f"import human_typer eagerly imports {name}")
+    return problems
+
+
+def check_stop(stop):
+    """Return stop latency problems independent of any baseline."""
+    if stop['latency_max_ms'] > stop['budget_ms']:
+        return [f"execute_plan() took {stop['latency_max_ms']:.1f}ms to stop > budget {stop['budget_ms']}ms"]
+    return []
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regressions of results vs baseline beyond tolerance (fraction)."""
+    regressions = []
+    b = baseline.get('startup')
+    if b and results['startup']['import_ms'] > b['import_ms'] * (1 + tolerance):
+        regressions.append(f"startup: import_ms {results['startup']['import_ms']:.1f} > "
+                           f"baseline {b['import_ms']:.1f}")
+    base = {(r['wpm'], r['error_rate']): r for r in baseline['settings']}
+    for r in results['settings']:
+        b = base.get((r['wpm'], r['error_rate']))
+        if not b:
+            continue
+        name = f"{r['wpm']} WPM / {r['error_rate']:.2f}"
+        # Higher is better
+        for key in ('plan_chars_per_s', 'plan_vec_chars_per_s'):
+            if r.get(key) and b.get(key) and r[key] < b[key] * (1 - tolerance):
+                regressions.append(f"{name}: {key} {r[key]:.0f} < baseline {b[key]:.0f}")
+        # Lower is better
+        if r['exec_us_per_key'] > b['exec_us_per_key'] * (1 + tolerance):
+            regressions.append(f"{name}: exec_us_per_key {r['exec_us_per_key']:.2f} > "
+                               f"baseline {b['exec_us_per_key']:.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Human Typer engine headlessly.")
+    parser.add_argument('--size', type=int, default=50_000, help='Characters of sample text (default: 50000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement, best is kept (default: 3)')
+    parser.add_argument('--scheduler-keys', type=int, default=500,
+                        help='Keys in the real-clock scheduler check, 0 to skip (default: 500)')
+    parser.add_argument('--startup-budget', type=float, default=STARTUP_BUDGET_MS,
+                        help=f'Max import time of human_typer in ms; exit 1 if exceeded (default: {STARTUP_BUDGET_MS})')
+    parser.add_argument('--save', help='Write results as JSON to this file')
+    parser.add_argument('--compare', help='Baseline JSON to compare against; exit 1 on regression')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown vs baseline as a fraction (default: 0.25)')
+    args = parser.parse_args()
+
+    text = sample_text(args.size)
+    results = {'text_chars': len(text), 'settings': []}
+    for wpm in WPM_GRID:
+        for error_rate in ERROR_RATE_GRID:
+            results['settings'].append(bench_setting(text, wpm, error_rate, args.repeat))
+
+    if args.scheduler_keys:
+        results['scheduler'] = bench_scheduler(args.scheduler_keys, 0.005)
+    else:
+        results['scheduler'] = {'keys': 0, 'interval_ms': 0, 'error_p50_ms': 0, 'error_p99_ms': 0, 'error_max_ms': 0}
+
+    results['stop'] = bench_stop()
+    results['startup'] = bench_startup()
+    results['startup']['budget_ms'] = args.startup_budget
+
+    print_results(results)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n  💾 Saved results to: {args.save}")
+
+    regressions = check_startup(results['startup']) + check_stop(results['stop'])
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions += compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n  ❌ {len(regressions)} regression(s) vs {args.compare}:")
+            for line in regressions:
+                print(f"     - {line}")
+            sys.exit(1)
+        print(f"\n  ✅ No regressions vs {args.compare} (tolerance {args.tolerance:.0%}).")
+    elif regressions:
+        print(f"\n  ❌ {len(regressions)} check(s) failed:")
+        for line in regressions:
+            print(f"     - {line}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Progress journal for long typing runs, so a stopped or crashed session
+can resume from the last confirmed character instead of from zero.
+
+The checkpoint is a small JSON file: text digest, planning parameters
+(including the seed, which fixes the RNG state for any offset), the
+number of correct characters confirmed typed and the number of typo
+characters typed after them and not yet corrected (a stop can fall between
+a typo and its backspaces; the resumed run deletes them first). Both counts
+are fixed-width and rewritten in place after every key, so journaling
+costs one seek + write + flush per key, whatever the document size.
+"""
+
+import hashlib
+import json
+import os
+
+from human_typer import iter_chunks
+
+CHECKPOINT_VERSION = 3
+
+# Width of the in-place offset and stray fields; JSON allows the padding whitespace
+_OFFSET_WIDTH = 20
+
+
+def default_checkpoint_path():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'human_typer', 'checkpoint.json')
+
+
+def text_digest(text):
+    """SHA-256 of a str or iterable of str chunks."""
+    digest = hashlib.sha256()
+    for chunk in iter_chunks(text):
+        digest.update(chunk.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load_checkpoint(path=None):
+    """Return the journal as a dict (digest, params, offset, stray), or None if there is none."""
+    path = path or default_checkpoint_path()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('version') != CHECKPOINT_VERSION:
+        return None
+    return state
+
+
+class Checkpoint:
+    """
+    Journal for one run.
+    params: Planning parameters needed to rebuild the same session (wpm, error_rate, seed, ...).
+    offset: Characters already typed before this run (when resuming).
+    stray: Uncorrected typo characters left after them (when resuming).
+    """
+
+    def __init__(self, digest, params, offset=0, path=None, stray=0):
+        self.path = path or default_checkpoint_path()
+        self.base = offset
+        self.offset = offset
+        self.stray = stray
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        header = json.dumps({'version': CHECKPOINT_VERSION, 'digest': digest, 'params': params})
+        prefix = header[:-1] + ', "offset": '
+        self._f = open(self.path, 'w', encoding='ascii')
+        self._f.write(prefix)
+        self._pos = self._f.tell()
+        self._write()
+        self._f.write('}')
+        self._f.flush()
+
+    def _write(self):
+        self._f.seek(self._pos)
+        self._f.write(f'{self.offset:>{_OFFSET_WIDTH}}, "stray": {self.stray:>{_OFFSET_WIDTH}}')
+        self._f.flush()
+
+    def confirm(self, typed):
+        """Record that typed characters (this run) made it to the backend; any typo before them is fixed."""
+        self.offset = self.base + typed
+        self.stray = 0
+        self._write()
+
+    def typo(self, count):
+        """Record count typo characters sent after the confirmed ones."""
+        self.stray += count
+        self._write()
+
+    def backspace(self):
+        """Record a backspace deleting one of the typo characters."""
+        if self.stray:
+            self.stray -= 1
+            self._write()
+
+    def close(self, completed=False):
+        """Close the journal; a completed run removes it since there is nothing to resume."""
+        if self._f is None:
+            return
+        self._f.close()
+        self._f = None
+        if completed:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Human Typer - Parallel multi-display runner.
+Types several jobs at once on several X displays (e.g. Xvfb instances):
+one worker process per display, each with its own injector and its own
+RNG streams, so targets never wait on each other or share a GIL.
+Progress and metrics from every target are gathered in this process.
+
+Jobs pinned to a display go there; the rest are spread so every display
+gets about the same amount of text. With --seed, each job's seed is
+derived from the run seed and the job's position, so reruns are identical.
+
+Usage:
+  python3 display_runner.py -d :1 -d :2 -f a.txt -f b.txt -f c.txt
+  python3 display_runner.py -d :1 -d :2 --jobs jobs.json --seed 7 --metrics run.json
+
+jobs.json is a list of {"file" or "text", "display", "wpm", "error_rate", "suppress_indent", "seed"},
+every key but file/text optional.
+
+Local test setup:
+  Xvfb :1 & Xvfb :2 &
+  python3 display_runner.py -d :1 -d :2 --backend xtest -f a.txt -f b.txt
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import random
+import signal
+import sys
+import time
+
+import human_typer
+from keystroke_backends import BACKENDS, get_backend
+
+# Keys between progress messages from a worker
+PROGRESS_EVERY = 100
+
+# Seconds between status lines
+STATUS_EVERY = 10.0
+
+DEFAULT_BACKEND = 'xtest'
+
+
+def job_seed(run_seed, index):
+    """Independent, reproducible seed for job index of a run seeded with run_seed."""
+    return random.Random(f'{run_seed}:{index}').getrandbits(64)
+
+
+def assign_jobs(jobs, displays):
+    """
+    Map each display to its list of (index, job). Pinned jobs stay on their display;
+    the others go, longest first, to the display with the least text so far.
+    """
+    assigned = {display: [] for display in displays}
+    load = dict.fromkeys(displays, 0)
+
+    def size(job):
+        return len(job['text']) if 'text' in job else os.path.getsize(job['file'])
+
+    free = []
+    for index, job in enumerate(jobs):
+        display = job.get('display')
+        if display is None:
+            free.append((size(job), index, job))
+        elif display not in assigned:
+            raise ValueError(f"Job {index} targets display {display!r}, which is not in the run")
+        else:
+            assigned[display].append((index, job))
+            load[display] += size(job)
+
+    for job_size, index, job in sorted(free, key=lambda item: -item[0]):
+        display = min(displays, key=load.get)
+        assigned[display].append((index, job))
+        load[display] += job_size
+
+    for display_jobs in assigned.values():
+        display_jobs.sort(key=lambda item: item[0])
+    return assigned
+
+
+def _progress(metrics):
+    return {'typed': metrics.typed, 'keys': metrics.keys, 'typos': metrics.typos,
+            'wpm': round(metrics.achieved_wpm, 1)}
+
+
+def _display_worker(display, jobs, backend_name, start_delay, stop_event, updates):
+    """Worker process: type jobs one after another on one display, then report how the display ended."""
+    from typing_metrics import TypingMetrics
+
+    # Ctrl+C reaches the whole process group; the parent decides and sets stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    os.environ['DISPLAY'] = display
+
+    try:
+        backend = get_backend(backend_name)
+    except (ImportError, OSError) as e:
+        updates.put(('failed', display, None, f'{type(e).__name__}: {e}'))
+        return
+
+    error = None
+    try:
+        if human_typer.sleep_or_stop(start_delay, stop_event):
+            jobs = ()
+        for index, job in jobs:
+            if stop_event.is_set():
+                break
+            source = human_typer.read_file_chunks(job['file']) if 'file' in job else job['text']
+            metrics = TypingMetrics(callback=lambda m, index=index: updates.put(('progress', display, index, _progress(m))),
+                                    callback_every=PROGRESS_EVERY)
+            try:
+                events = human_typer.pipeline_events(
+                    human_typer.iter_keystrokes(source, job['wpm'], job['error_rate'], job['suppress_indent'],
+                                                job['seed']),
+                    metrics=metrics)
+                human_typer.execute_plan(events, stop_event, backend, metrics=metrics)
+            except Exception as e:
+                updates.put(('failed', display, index, f'{type(e).__name__}: {e}'))
+                continue
+            state = 'stopped' if stop_event.is_set() else 'done'
+            updates.put((state, display, index, metrics.to_dict()))
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+    finally:
+        backend.close()
+    state = 'failed' if error else 'stopped' if stop_event.is_set() else 'done'
+    updates.put((state, display, None, error))
+
+
+class RunStatus:
+    """Per-target progress and final metrics, aggregated in the parent."""
+
+    def __init__(self, assigned):
+        self.jobs = {index: {'display': display, 'state': 'queued', 'progress': {}, 'metrics': None, 'error': None}
+                     for display, jobs in assigned.items() for index, _ in jobs}
+        self.displays = {display: {'state': 'running' if jobs else 'done', 'error': None}
+                         for display, jobs in assigned.items()}
+        self.started = time.perf_counter()
+
+    def update(self, kind, display, index, payload):
+        if index is None:
+            # The display's worker ended: done, stopped or failed (payload: error)
+            self.displays[display] = {'state': kind, 'error': payload}
+            if kind == 'failed':
+                for job in self.jobs.values():
+                    if job['display'] == display and job['state'] in ('queued', 'running'):
+                        job['state'] = 'failed'
+            return
+        job = self.jobs[index]
+        if kind == 'progress':
+            job['state'] = 'running'
+            job['progress'] = payload
+        elif kind == 'failed':
+            job['state'] = 'failed'
+            job['error'] = payload
+        else:
+            job['state'] = kind
+            job['metrics'] = payload
+            job['progress'] = {'typed': payload['typed'], 'keys': payload['keys'], 'typos': payload['typos'],
+                               'wpm': round(payload['achieved_wpm'], 1)}
+
+    def per_display(self):
+        rows = {}
+        for job in self.jobs.values():
+            row = rows.setdefault(job['display'], {'jobs': 0, 'done': 0, 'typed': 0, 'typos': 0})
+            row['jobs'] += 1
+            row['done'] += job['state'] in ('done', 'stopped', 'failed')
+            row['typed'] += job['progress'].get('typed', 0)
+            row['typos'] += job['progress'].get('typos', 0)
+        return rows
+
+    def print_status(self):
+        elapsed = time.perf_counter() - self.started
+        parts = [f"{display} {row['done']}/{row['jobs']} jobs {row['typed']} chars"
+                 for display, row in sorted(self.per_display().items())]
+        print(f"  [{human_typer.format_seconds(elapsed)}] " + ' | '.join(parts), flush=True)
+
+    def to_dict(self):
+        elapsed = time.perf_counter() - self.started
+        typed = sum(job['progress'].get('typed', 0) for job in self.jobs.values())
+        return {
+            'elapsed_seconds': elapsed,
+            'typed_chars': typed,
+            'chars_per_second': typed / elapsed if elapsed > 0 else 0.0,
+            'displays': {display: dict(row, **self.displays[display])
+                         for display, row in self.per_display().items()},
+            'jobs': [dict(job, index=index) for index, job in sorted(self.jobs.items())],
+        }
+
+
+def run_jobs(jobs, displays, backend=DEFAULT_BACKEND, start_delay=0, seed=None, status_every=STATUS_EVERY):
+    """
+    Type jobs (dicts with 'text' or 'file' plus optional display/wpm/error_rate/
+    suppress_indent/seed) across displays, one worker process per display.
+    Returns the aggregated RunStatus.
+    """
+    defaults = {'wpm': 60, 'error_rate': 0.06, 'suppress_indent': False, 'seed': None}
+    jobs = [dict(defaults, **job) for job in jobs]
+    if seed is not None:
+        for index, job in enumerate(jobs):
+            if job['seed'] is None:
+                job['seed'] = job_seed(seed, index)
+
+    assigned = assign_jobs(jobs, displays)
+    status = RunStatus(assigned)
+    updates = multiprocessing.Queue()
+    stop_event = multiprocessing.Event()
+    workers = {display: multiprocessing.Process(target=_display_worker, name=f'human-typer {display}',
+                                                args=(display, display_jobs, backend, start_delay, stop_event,
+                                                      updates))
+               for display, display_jobs in assigned.items() if display_jobs}
+    for worker in workers.values():
+        worker.start()
+
+    next_status = time.perf_counter() + status_every
+    try:
+        while any(worker.is_alive() for worker in workers.values()) or not updates.empty():
+            try:
+                status.update(*updates.get(timeout=0.2))
+            except queue.Empty:
+                pass
+            if status_every and time.perf_counter() >= next_status:
+                next_status += status_every
+                status.print_status()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping all displays...")
+        stop_event.set()
+        for worker in workers.values():
+            worker.join()
+        while True:
+            try:
+                status.update(*updates.get_nowait())
+            except queue.Empty:
+                break
+    for display, worker in workers.items():
+        worker.join()
+        if status.displays[display]['state'] == 'running':
+            # Died without reporting (killed, crashed interpreter)
+            status.update('failed', display, None, f'worker exited with code {worker.exitcode}')
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Type jobs in parallel on several X displays.")
+    parser.add_argument('-d', '--display', action='append', required=True, help='Target display, e.g. :1 (repeat)')
+    parser.add_argument('-f', '--file', action='append', default=[], help='Text file to type as one job (repeat)')
+    parser.add_argument('--jobs', metavar='FILE', help='JSON list of jobs (file/text, display, wpm, error_rate, ...)')
+    parser.add_argument('--wpm', type=int, default=60, help='Words per minute (default: 60)')
+    parser.add_argument('--error-rate', type=float, default=0.06, help='Typo probability 0.0-1.0 (default: 0.06)')
+    parser.add_argument('--seed', type=int, help='Run seed; every job gets its own stream derived from it')
+    parser.add_argument('--delay', type=int, default=0, help='Seconds before typing starts (default: 0)')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=DEFAULT_BACKEND,
+                        help=f'Keystroke backend in each worker (default: {DEFAULT_BACKEND})')
+    parser.add_argument('--metrics', metavar='FILE', help='Write aggregated per-target metrics as JSON')
+    args = parser.parse_args()
+
+    jobs = [{'file': path, 'wpm': args.wpm, 'error_rate': args.error_rate} for path in args.file]
+    if args.jobs:
+        with open(args.jobs, 'r', encoding='utf-8') as f:
+            for job in json.load(f):
+                jobs.append(dict({'wpm': args.wpm, 'error_rate': args.error_rate}, **job))
+    if not jobs:
+        print("❌ No jobs given (use -f or --jobs). Exiting.")
+        sys.exit(1)
+
+    print(f"🖥  {len(jobs)} job(s) on {len(args.display)} display(s): {', '.join(args.display)}")
+    try:
+        status = run_jobs(jobs, args.display, backend=args.backend, start_delay=args.delay, seed=args.seed)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    result = status.to_dict()
+    for display, row in sorted(result['displays'].items()):
+        note = f" ({row['error']})" if row['error'] else ''
+        print(f"  {display}: {row['done']}/{row['jobs']} jobs, {row['typed']} chars, {row['typos']} typos{note}")
+    for job in result['jobs']:
+        if job['error']:
+            print(f"  ❌ Job {job['index']} on {job['display']}: {job['error']}")
+    print(f"\n  ✅ Typed {result['typed_chars']} characters in {result['elapsed_seconds']:.1f}s "
+          f"({result['chars_per_second']:.0f} chars/s across all displays).")
+
+    if args.metrics:
+        with open(args.metrics, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"  📊 Metrics written to: {args.metrics}")
+
+
+if __name__ == '__main__':
+    main()
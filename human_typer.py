@@ -13,25 +13,36 @@ Options:
   --wpm 60          Words per minute (default: 60)
   --error-rate 0.06 Typo probability 0.0-1.0 (default: 0.06 = 6%)
   --delay 3         Seconds to wait before typing starts (default: 3)
+  --backend xtest   Keystroke backend: pyautogui (default) or xtest (native X11)
+  --metrics m.json  Write latency/timing metrics (JSON, or Prometheus text for .prom)
+  --vectorized      Plan with NumPy (fast for very large texts)
+  --burst           Batch keys with indistinguishable gaps into single injections
+  --timing-model m.htt  Key rhythm from a table built with timing_model.py
+  --seed 42         RNG seed for a reproducible session
+  --record s.hts    Save the planned session to a file (add --plan-only to skip typing)
+  --replay s.hts    Type a recorded session exactly, without re-planning
+  --duration 1:30   Finish in this time (SECONDS or [H:]MM:SS) instead of at a fixed WPM
+  --deadline 17:45  Finish at this local time (HH:MM); --wpm only shapes the rhythm
+  --resume          Continue an interrupted run of the same text where it stopped
+  --retype old.txt  The field already holds old.txt (or the part a checkpoint says was typed):
+                    only type the changes that turn it into the new text
+  --export xdotool  Write the session as an xdotool script instead of typing it (-o FILE, default stdout)
+  --batch DIR       Plan every file in DIR to a session file (for --replay) on all cores (-o OUT_DIR)
+  --jobs 8          Processes for planning (--batch, and recorded/seeded plans of large texts)
 """
 
 import time
 import random
-import string
-import argparse
+import mmap
+import struct
+import itertools
 import sys
+from array import array
 
-try:
-    import pyautogui
-except ImportError:
-    print("=" * 60)
-    print("  pyautogui is required but not installed.")
-    print("  Install it with:  pip install pyautogui")
-    print("=" * 60)
-    sys.exit(1)
+from keystroke_backends import BACKENDS, DEFAULT_BACKEND, KeystrokeBackend, get_backend
 
-# Disable pyautogui's failsafe pause for smoother typing
-pyautogui.PAUSE = 0
+# Same as string.ascii_lowercase; importing string pulls in re, the biggest cost at startup
+ASCII_LOWERCASE = 'abcdefghijklmnopqrstuvwxyz'
 
 # ──────────────────────────────────────────────────────
 # QWERTY adjacent key map for realistic typos
@@ -69,15 +80,23 @@ ADJACENT_KEYS = {
 # Typo generators
 # ──────────────────────────────────────────────────────
 
-def get_adjacent_typo(char):
-    """Return a nearby key on QWERTY layout."""
+def get_adjacent_typo(char, rng=random):
+    """
+    Return a nearby key on QWERTY layout. Accented Latin letters come out
+    without their accent (the usual slip); other scripts are returned as-is.
+    """
     lower = char.lower()
     if lower in ADJACENT_KEYS:
-        typo = random.choice(ADJACENT_KEYS[lower])
+        typo = rng.choice(ADJACENT_KEYS[lower])
         return typo.upper() if char.isupper() else typo
+    if not char.isascii():
+        import unicodedata
+        base = unicodedata.normalize('NFD', char)[0]
+        if base != char and base.isascii():
+            return base
     return char
 
-def generate_typo(char, next_char=None):
+def generate_typo(char, next_char=None, rng=random):
     """
     Generate a realistic typo. Returns (typo_string, num_backspaces_needed).
     Types:
@@ -86,13 +105,15 @@ def generate_typo(char, next_char=None):
       - Transposition (swap with next char)
       - Extra random letter
     """
-    roll = random.random()
+    roll = rng.random()
 
     if roll < 0.50:
         # Adjacent key hit
-        typo = get_adjacent_typo(char)
+        typo = get_adjacent_typo(char, rng)
         if typo == char:  # fallback if no adjacent found
-            typo = random.choice(string.ascii_lowercase)
+            if not char.isascii():
+                return char + char, 2  # No QWERTY neighbours (e.g. CJK): double strike instead
+            typo = rng.choice(ASCII_LOWERCASE)
         return typo, 1
 
     elif roll < 0.70:
@@ -105,7 +126,7 @@ def generate_typo(char, next_char=None):
 
     else:
         # Random extra letter inserted before the real char
-        extra = random.choice(string.ascii_lowercase)
+        extra = rng.choice(ASCII_LOWERCASE)
         return extra, 1
 
 
@@ -113,182 +134,1183 @@ def generate_typo(char, next_char=None):
 # Core typing engine
 # ──────────────────────────────────────────────────────
 
-def human_delay(base_delay, char, prev_char):
+# Common bigrams typed faster than average
+FAST_BIGRAMS = frozenset(['th', 'he', 'in', 'er', 'an', 're', 'on', 'at', 'en', 'nd', 'st', 'es', 'or', 'te', 'of', 'it', 'is'])
+
+
+# ASCII-lowercased (prev, char) code pair -> 1 for FAST_BIGRAMS, so the hot path
+# looks up two code points instead of building and hashing a new str per key
+_ASCII_LOWER = bytes(c + 32 if 65 <= c <= 90 else c for c in range(128))
+_FAST_BIGRAM_TABLE = bytearray(128 * 128)
+for _bigram in FAST_BIGRAMS:
+    _FAST_BIGRAM_TABLE[ord(_bigram[0]) << 7 | ord(_bigram[1])] = 1
+
+
+def human_delay(base_delay, char, prev_char, rng=random, timing=None, next_char=None):
     """
     Calculate a human-like delay with natural variation.
     - Faster for common bigrams
     - Slower after spaces/punctuation (thinking)
     - Random jitter
+    timing: Optional timing_model.TimingModel. Its tables then give the interval
+    from char to next_char (in the context of prev_char), replacing the jitter,
+    word gaps and FAST_BIGRAMS.
     """
-    delay = base_delay
+    if timing:
+        # Nothing follows the last key, so its pause is plain jitter
+        if next_char is None:
+            delay = base_delay * rng.uniform(0.6, 1.4)
+        else:
+            delay = timing.key_delay(base_delay, prev_char, char, next_char, rng)
+
+        # Thinking pauses aren't part of the typing rhythm the tables capture
+        if char in '.!?\n':
+            delay += rng.uniform(0.2, 0.8)
+
+    else:
+        delay = base_delay
 
-    # Add jitter (±40%)
-    delay *= random.uniform(0.6, 1.4)
+        # Add jitter (±40%)
+        delay *= rng.uniform(0.6, 1.4)
 
-    # Slow down after sentence-ending punctuation (thinking pause)
-    if prev_char in '.!?\n':
-        delay += random.uniform(0.2, 0.8)
+        # Slow down after sentence-ending punctuation (thinking pause)
+        if prev_char in '.!?\n':
+            delay += rng.uniform(0.2, 0.8)
 
-    # Slight pause after spaces (between words)
-    elif prev_char == ' ':
-        delay += random.uniform(0.02, 0.12)
+        # Slight pause after spaces (between words)
+        elif prev_char == ' ':
+            delay += rng.uniform(0.02, 0.12)
 
-    # Speed up for common bigrams
-    fast_bigrams = ['th', 'he', 'in', 'er', 'an', 're', 'on', 'at', 'en', 'nd', 'st', 'es', 'or', 'te', 'of', 'it', 'is']
-    if prev_char and (prev_char.lower() + char.lower()) in fast_bigrams:
-        delay *= 0.7
+        # Speed up for common bigrams
+        if prev_char:
+            p, c = ord(prev_char), ord(char)
+            if p < 128 and c < 128:
+                fast = _FAST_BIGRAM_TABLE[_ASCII_LOWER[p] << 7 | _ASCII_LOWER[c]]
+            else:
+                fast = (prev_char.lower() + char.lower()) in FAST_BIGRAMS
+            if fast:
+                delay *= 0.7
 
     # Occasional micro-pause (cognitive hesitation)
-    if random.random() < 0.03:
-        delay += random.uniform(0.3, 1.0)
+    if rng.random() < 0.03:
+        delay += rng.uniform(0.3, 1.0)
 
     return max(0.01, delay)
 
 
-def type_text(text, wpm=60, error_rate=0.06, start_delay=3, stop_event=None, suppress_indent=False):
+# ──────────────────────────────────────────────────────
+# Keystroke plan
+# ──────────────────────────────────────────────────────
+
+ACTION_TYPE = 0       # Correct character that stays in the output
+ACTION_TYPO = 1       # Wrong character that will be backspaced
+ACTION_BACKSPACE = 2  # Backspace press correcting a typo
+ACTION_NAV = 3        # Cursor movement (incremental retype); key is one of NAV_KEYS
+
+BACKSPACE = '\b'
+
+# Cursor movement keys, stored in plans as private-use code points
+CURSOR_LEFT = '\ue000'
+CURSOR_RIGHT = '\ue001'
+CURSOR_UP = '\ue002'
+CURSOR_DOWN = '\ue003'
+CURSOR_LINE_START = '\ue004'
+CURSOR_LINE_END = '\ue005'
+CURSOR_DOC_START = '\ue006'
+
+# Backend key (or key combo) for each cursor movement
+NAV_KEYS = {
+    CURSOR_LEFT: ('left',),
+    CURSOR_RIGHT: ('right',),
+    CURSOR_UP: ('up',),
+    CURSOR_DOWN: ('down',),
+}
+if sys.platform == 'darwin':
+    NAV_KEYS.update({CURSOR_LINE_START: ('command', 'left'), CURSOR_LINE_END: ('command', 'right'),
+                     CURSOR_DOC_START: ('command', 'up')})
+else:
+    NAV_KEYS.update({CURSOR_LINE_START: ('home',), CURSOR_LINE_END: ('end',),
+                     CURSOR_DOC_START: ('ctrl', 'home')})
+
+
+# Session file layout: magic | header length (uint32 LE) | JSON header | padding to 8 bytes
+# | delays (float64) | keys (uint32) | actions (uint8), all little-endian
+SESSION_MAGIC = b'HTSESS1\0'
+
+
+class KeystrokePlan:
     """
-    Types text into the currently focused window with human-like behavior.
-    Makes typos and corrects them. Final output is 100% correct.
-    Supports a stop_event to interrupt typing.
-    suppress_indent: If True, skips leading whitespace of new lines (useful for IDEs that auto-indent).
+    Compact, array-backed timeline of keystroke events.
+    Each event is (key, action, delay) where delay is the pause in
+    seconds after the key is emitted.
+    meta: Parameters the plan was made with (wpm, error_rate, seed, ...).
     """
-    # Base delay per character from WPM (avg 5 chars per word)
-    base_delay = 60.0 / (wpm * 5)
 
-    print(f"\n{'='*60}")
-    print(f"  HUMAN TYPER")
-    print(f"  Speed: ~{wpm} WPM | Error rate: {error_rate*100:.0f}%")
-    print(f"  Text length: {len(text)} characters")
-    print(f"{'='*60}")
-    
-    if start_delay > 0:
-        print(f"\n  ⏳ Typing starts in {start_delay} seconds...")
-        print(f"  👉 Click on the target window/field NOW!\n")
+    def __init__(self, meta=None):
+        self.keys = array('I')     # Unicode code point of each key
+        self.actions = array('B')  # ACTION_* code of each key
+        self.delays = array('d')   # Seconds to wait after each key
+        self.meta = dict(meta or {})
 
-        # Countdown
-        for i in range(start_delay, 0, -1):
-            if stop_event and stop_event.is_set():
-                print("🛑 Typing cancelled before start.")
-                return
-            print(f"     {i}...")
-            time.sleep(1)
-            
-    print(f"     ✏️  Typing!\n")
+    def append(self, key, action, delay):
+        self.keys.append(ord(key))
+        self.actions.append(action)
+        self.delays.append(delay)
 
-    prev_char = ''
-    i = 0
+    def __len__(self):
+        return len(self.keys)
 
-    while i < len(text):
-        # Check for stop signal
-        if stop_event and stop_event.is_set():
-            print("\n🛑 Typing interrupted by user.")
-            break
+    def __iter__(self):
+        for key, action, delay in zip(self.keys, self.actions, self.delays):
+            yield chr(key), action, delay
 
-        char = text[i]
-        next_char = text[i + 1] if i + 1 < len(text) else None
-        
-        # Determine if we should skip this character (Anti-Auto-Indent)
-        skip_char = False
-        if suppress_indent and char in ' \t':
-             # If previous char was newline, we are in indentation
-             if prev_char == '\n' or (i == 0):
-                 skip_char = True
-             # If we are in a sequence of spaces that follow a newline, keep skipping
-             # But we only look back one char. We need a way to know if we are 'in indentation'.
-             # More robust: check if all chars since last \n are whitespace
-             # This simple check prev_char == '\n' only catches the FIRST space.
-             
-             # Better logic: Check if we are currently at the start of a line (only whitespace before us on this line)
-             j = i - 1
-             is_indentation = True
-             while j >= 0:
-                 if text[j] == '\n':
-                     break # Found start of line, so yes we are in indentation
-                 if text[j] not in ' \t':
-                     is_indentation = False # Found non-whitespace, so not indentation
-                     break
-                 j -= 1
-             # Provide fallback if start of text
-             if j < 0 and i > 0: # Start of text, check if all before were whitespace
-                 # reuse is_indentation logic above which defaults to True
-                 pass
-             
-             if is_indentation:
-                 # It is indentation space, skip it!
-                 skip_char = True
-
-        if skip_char:
-            i += 1
-            continue
+    @property
+    def typed_chars(self):
+        """Number of characters that end up in the final output."""
+        return self.actions.tobytes().count(ACTION_TYPE)
+
+    @property
+    def duration(self):
+        """Total planned time in seconds."""
+        return sum(self.delays)
+
+    def non_ascii(self):
+        """Distinct non-ASCII characters the plan types (cursor keys aside), for backend.prepare()."""
+        return {chr(code) for code in set(self.keys) if code > 0x7f} - NAV_KEYS.keys()
+
+    def save(self, path):
+        """
+        Write the exact event stream to a compact binary session file. The file is
+        written next to path and renamed over it, so a failed save leaves no partial file
+        (and a plan mapped from path by load(use_mmap=True) can be saved back to it).
+        """
+        import json
+        import os
+        header = json.dumps(dict(self.meta, events=len(self))).encode('utf-8')
+        padding = -(len(SESSION_MAGIC) + 4 + len(header)) % 8
+        tmp = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(SESSION_MAGIC)
+                f.write(struct.pack('<I', len(header)))
+                f.write(header + b' ' * padding)
+                for arr in (self.delays, self.keys, self.actions):
+                    # Arrays, or memoryviews of a mapped session file
+                    if sys.byteorder == 'big':
+                        arr = array(arr.typecode, arr)
+                        arr.byteswap()
+                    f.write(memoryview(arr).cast('B'))
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path, use_mmap=False):
+        """
+        Read a session file written by save(); nothing is recomputed.
+        use_mmap: Map the file and view the arrays in place instead of copying them
+        (read-only plan; loads in O(1) regardless of size).
+        """
+        import json
+
+        if use_mmap and sys.byteorder == 'little':
+            return cls._load_mmap(path)
+
+        with open(path, 'rb') as f:
+            if f.read(len(SESSION_MAGIC)) != SESSION_MAGIC:
+                raise ValueError(f"{path} is not a Human Typer session file")
+            header_len, = struct.unpack('<I', f.read(4))
+            meta = json.loads(f.read(header_len))
+            f.read(-(len(SESSION_MAGIC) + 4 + header_len) % 8)
+
+            count = meta.pop('events')
+            plan = cls(meta)
+            for arr in (plan.delays, plan.keys, plan.actions):
+                arr.fromfile(f, count)
+                if sys.byteorder == 'big':
+                    arr.byteswap()
+        return plan
+
+    @classmethod
+    def _load_mmap(cls, path):
+        import json
+
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if mm[:len(SESSION_MAGIC)] != SESSION_MAGIC:
+            mm.close()
+            raise ValueError(f"{path} is not a Human Typer session file")
+        offset = len(SESSION_MAGIC)
+        header_len, = struct.unpack_from('<I', mm, offset)
+        offset += 4
+        meta = json.loads(mm[offset:offset + header_len])
+        offset += header_len
+        offset += -offset % 8
+
+        count = meta.pop('events')
+        plan = cls(meta)
+        view = memoryview(mm)
+        # The padding keeps delays 8-byte and keys 4-byte aligned for cast()
+        plan.delays = view[offset:offset + 8 * count].cast('d')
+        offset += 8 * count
+        plan.keys = view[offset:offset + 4 * count].cast('I')
+        offset += 4 * count
+        plan.actions = view[offset:offset + count]
+        plan._mmap = mm  # Keep the mapping alive as long as the plan
+        return plan
+
+
+# Characters read per chunk when streaming a file or file-like source
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_chunks(source):
+    """
+    Yield text chunks from a str, a file-like object (anything with .read())
+    or any other iterable of str chunks.
+    """
+    if isinstance(source, str):
+        yield source
+    elif hasattr(source, 'read'):
+        yield from iter(lambda: source.read(CHUNK_SIZE), '')
+    else:
+        yield from source
+
+
+def read_file_chunks(path, encoding='utf-8'):
+    """Lazily read a text file in CHUNK_SIZE pieces; the file stays open only while iterated."""
+    with open(path, 'r', encoding=encoding, newline='') as f:
+        yield from iter_chunks(f)
+
+
+def non_ascii_chars(source):
+    """
+    Distinct non-ASCII characters of a str or iterable of str chunks, for backend.prepare()
+    when the text is streamed rather than planned up front (see KeystrokePlan.non_ascii()).
+    """
+    chars = set()
+    for chunk in iter_chunks(source):
+        if not chunk.isascii():
+            chars.update(chunk)
+    return {char for char in chars if char > '\x7f'}
+
+
+def prepare_chunks(chunks, suppress_indent=False):
+    """
+    Normalize line endings and, for anti-double-indent, strip leading
+    whitespace from every line. Single forward pass over the chunks;
+    a \r\n pair or an indentation run split across chunks is handled.
+    """
+    carry = ''
+    at_line_start = True
+
+    for chunk in chunks:
+        chunk = carry + chunk
+        # A trailing \r might be the first half of a \r\n split across chunks
+        carry = '\r' if chunk.endswith('\r') else ''
+        if carry:
+            chunk = chunk[:-1]
+
+        # \r\n and lone \r would otherwise reach the backend as a raw '\r' press
+        chunk = chunk.replace('\r\n', '\n').replace('\r', '\n')
 
+        if suppress_indent:
+            # The target IDE auto-indents, so only send what follows the indentation
+            lines = chunk.split('\n')
+            for n, line in enumerate(lines):
+                if n > 0:
+                    at_line_start = True
+                if at_line_start:
+                    line = line.lstrip(' \t')
+                    # A whitespace-only tail keeps us in indentation for the next chunk
+                    at_line_start = not line
+                    lines[n] = line
+            chunk = '\n'.join(lines)
+
+        if chunk:
+            yield chunk
+
+    if carry:
+        yield '\n'
+
+
+def prepare_text(text, suppress_indent=False):
+    """Normalize a whole str at once. See prepare_chunks()."""
+    return ''.join(prepare_chunks([text], suppress_indent))
+
+
+def _iter_with_next(chunks):
+    """Yield (char, next_char) across chunk boundaries; next_char is None at the end."""
+    prev = None
+    for chunk in chunks:
+        for char in chunk:
+            if prev is not None:
+                yield prev, char
+            prev = char
+    if prev is not None:
+        yield prev, None
+
+
+# Sessions are planned in pieces that end at the first sentence end (or newline)
+# after PLAN_PIECE_CHARS characters, or after PLAN_PIECE_MAX_CHARS whatever comes
+# next (a single-line or unpunctuated text), each calibrated to the WPM on its own
+# (see _calibrate()). A piece is planned whole before its first key is typed, so
+# the cap also bounds memory and the wait for the first key when streaming. Seeded pieces draw from their own RNG streams (piece_seed()),
+# so the pieces of a long text can be planned in parallel (see batch_planner.py)
+# and still add up to exactly the serial plan.
+PLAN_PIECE_CHARS = 64 * 1024
+PLAN_PIECE_MAX_CHARS = 2 * PLAN_PIECE_CHARS
+
+
+def piece_seed(seed, index):
+    """RNG seed of plan piece index of a session seeded with seed; the first piece uses seed itself."""
+    return seed if index == 0 else random.Random(f'{seed}/{index}').getrandbits(64)
+
+
+def _take_piece(pairs):
+    """Yield (char, next_char) pairs up to and including the last one of the current plan piece."""
+    count = 0
+    for char, next_char in pairs:
+        yield char, next_char
+        count += 1
+        if count >= PLAN_PIECE_CHARS and (
+                char == '\n' or (char in '.!?' and (next_char is None or next_char in ' \t\n'))
+                or count >= PLAN_PIECE_MAX_CHARS):
+            return
+
+
+def split_pieces(text):
+    """(start, end) of every plan piece of prepared text, cut where seeded iter_keystrokes() cuts."""
+    import re
+    piece_end = re.compile(r'\n|[.!?](?=[ \t\n]|\Z)')
+    pieces = []
+    start = 0
+    while start < len(text):
+        match = piece_end.search(text, start + PLAN_PIECE_CHARS - 1)
+        end = min(match.end() if match else len(text), start + PLAN_PIECE_MAX_CHARS)
+        pieces.append((start, end))
+        start = end
+    return pieces
+
+
+def _piece_events(pairs, rng, base_delay, error_rate, timing, prev_char=''):
+    """
+    Events ([key, action, delay] lists) for (char, next_char) pairs, calibrated
+    (see _calibrate()); returns them and the last char (prev_char of what follows).
+    """
+    events = []
+    for char, next_char in pairs:
         # Decide if we make a typo on this character
         make_error = (
-            random.random() < error_rate
+            rng.random() < error_rate
             and char.isalpha()          # Only typo on letters
             and prev_char not in '.!?\n'  # Don't typo right after sentence end
         )
 
         if make_error:
-            # Generate and type the typo
-            typo_str, backspaces = generate_typo(char, next_char)
+            typo_str, backspaces = generate_typo(char, next_char, rng)
 
             # Type the wrong character(s)
             for tc in typo_str:
-                if stop_event and stop_event.is_set(): break
-                pyautogui.press(tc) if len(tc) == 1 and tc in string.printable else pyautogui.typewrite(tc, interval=0)
-                time.sleep(base_delay * random.uniform(0.5, 1.0))
-            
-            if stop_event and stop_event.is_set(): break
+                events.append([tc, ACTION_TYPO, base_delay * rng.uniform(0.5, 1.0)])
 
             # Brief pause — "noticing" the mistake
-            time.sleep(random.uniform(0.1, 0.4))
+            events[-1][2] += rng.uniform(0.1, 0.4)
 
             # Backspace to fix
             for _ in range(backspaces):
-                if stop_event and stop_event.is_set(): break
-                pyautogui.press('backspace')
-                time.sleep(random.uniform(0.03, 0.08))
-            
-            if stop_event and stop_event.is_set(): break
+                events.append([BACKSPACE, ACTION_BACKSPACE, rng.uniform(0.03, 0.08)])
 
             # Small pause after correction
-            time.sleep(random.uniform(0.05, 0.15))
+            events[-1][2] += rng.uniform(0.05, 0.15)
 
-            # Now type the correct character
-            _type_char(char)
-            time.sleep(human_delay(base_delay, char, prev_char))
-
-        else:
-            # Normal typing
-            _type_char(char)
-            time.sleep(human_delay(base_delay, char, prev_char))
+        # Type the correct character
+        events.append([char, ACTION_TYPE, human_delay(base_delay, char, prev_char, rng, timing, next_char)])
 
         prev_char = char
-        i += 1
 
         # Occasional natural break (every ~200-500 chars)
-        if random.random() < 0.003:
-            time.sleep(random.uniform(1.0, 3.0))
+        if rng.random() < 0.003:
+            events[-1][2] += rng.uniform(1.0, 3.0)
+
+    _calibrate(events, base_delay)
+    return events, prev_char
+
+
+def _calibrate(events, base_delay):
+    """
+    Scale the delays of events in place so they take base_delay per correct
+    character on the whole. Pauses, micro-pauses and corrections come on top of
+    the per-key jitter, so uncalibrated plans run well below --wpm; scaling keeps
+    the rhythm's shape while the achieved WPM matches the requested one.
+    """
+    typed = 0
+    total = 0.0
+    for event in events:
+        total += event[2]
+        if event[1] == ACTION_TYPE:
+            typed += 1
+    if total > 0:
+        scale = base_delay * typed / total
+        for event in events:
+            event[2] *= scale
+
+
+def iter_keystrokes(source, wpm=60, error_rate=0.06, suppress_indent=False, seed=None, timing=None):
+    """
+    Generate keystroke events (key, action, delay) for source lazily.
+    source: A str, file-like object or iterable of str chunks. Only one
+    chunk (and one plan piece, see PLAN_PIECE_CHARS) is held in memory
+    at a time, so input size does not matter.
+    seed: Optional seed for a private RNG, making the session reproducible.
+    timing: Optional timing_model.TimingModel for data-driven key rhythm (see human_delay()).
+    """
+    # Base delay per character from WPM (avg 5 chars per word)
+    base_delay = 60.0 / (wpm * 5)
+
+    pairs = _iter_with_next(prepare_chunks(iter_chunks(source), suppress_indent))
+    rng = random.Random() if seed is None else None  # Unseeded: one stream across pieces
+    prev_char = ''
+    for index in itertools.count():
+        first = next(pairs, None)
+        if first is None:
+            return
+        events, prev_char = _piece_events(_take_piece(itertools.chain((first,), pairs)),
+                                          rng or random.Random(piece_seed(seed, index)), base_delay,
+                                          error_rate, timing, prev_char)
+        for key, action, delay in events:
+            yield key, action, delay
+
+
+def plan_piece(piece, prev_char, next_char, seed, index, wpm=60, error_rate=0.06, timing=None):
+    """
+    KeystrokePlan of plan piece index (see split_pieces()) of a prepared text, equal to
+    that stretch of iter_keystrokes(text, seed=seed). prev_char / next_char: The text's
+    characters around the piece ('' / None at its ends).
+    """
+    pairs = zip(piece, itertools.chain(piece[1:], (next_char,)))
+    events, _ = _piece_events(pairs, random.Random(piece_seed(seed, index)), 60.0 / (wpm * 5),
+                              error_rate, timing, prev_char)
+    plan = KeystrokePlan()
+    for key, action, delay in events:
+        plan.append(key, action, delay)
+    return plan
+
+
+def plan_keystrokes(text, wpm=60, error_rate=0.06, suppress_indent=False, seed=None, vectorized=False,
+                    timing=None, jobs=1):
+    """
+    Build the full keystroke timeline for text ahead of time.
+    All typo decisions, delays and indentation handling happen here,
+    so the executor only has to sleep and emit.
+    seed: Optional seed for a private RNG, making the plan reproducible.
+    vectorized: Use the NumPy planner (much faster on large texts, needs numpy).
+    timing: Optional timing_model.TimingModel for data-driven key rhythm.
+    jobs: Plan the pieces of a long text on this many processes (see batch_planner.py);
+          the plan is the same as with jobs=1. Unseeded plans then get a random seed.
+    """
+    if vectorized:
+        plan = plan_keystrokes_vectorized(text, wpm, error_rate, suppress_indent, seed, timing)
+    elif jobs > 1:
+        from batch_planner import plan_parallel
+        plan = plan_parallel(text, wpm, error_rate, suppress_indent, seed, timing, jobs)
+        seed = plan.meta['seed']
+    else:
+        plan = KeystrokePlan()
+        for key, action, delay in iter_keystrokes(text, wpm, error_rate, suppress_indent, seed, timing):
+            plan.append(key, action, delay)
+
+    plan.meta = {'wpm': wpm, 'error_rate': error_rate, 'suppress_indent': bool(suppress_indent),
+                 'seed': seed, 'vectorized': bool(vectorized)}
+    if timing:
+        plan.meta['timing'] = timing.digest
+    return plan
+
+
+def plan_keystrokes_vectorized(text, wpm=60, error_rate=0.06, suppress_indent=False, seed=None, timing=None):
+    """
+    NumPy version of plan_keystrokes(). Jitter, pauses, bigram speedups,
+    micro-pauses, natural breaks and typo rolls are drawn for the whole text
+    in a few array operations; only the rare typo events run Python code.
+    Follows the same distribution as the scalar path (not the same values).
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("The vectorized planner needs NumPy. Install it with:  pip install numpy")
+
+    text = prepare_text(text if isinstance(text, str) else ''.join(iter_chunks(text)), suppress_indent)
+    plan = KeystrokePlan()
+    n = len(text)
+    if not n:
+        return plan
+
+    gen = np.random.default_rng(seed)
+    rng = random.Random(seed)  # Scalar draws for typo details
+
+    # Base delay per character from WPM (avg 5 chars per word)
+    base_delay = 60.0 / (wpm * 5)
+
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    # prev_char of the first character is '' which, like the scalar path, counts as a sentence end
+    prev = np.empty(n, dtype=np.uint32)
+    prev[0] = ord('\n')
+    prev[1:] = codes[:-1]
+
+    after_sentence = np.isin(prev, [ord(c) for c in '.!?\n'])
+
+    if timing:
+        # Table rhythm: (mu, sigma) of the interval from each key to the next, gathered
+        # by slot arithmetic with trigram -> bigram -> default fallback
+        from timing_model import DEFAULT_SIGMA, OTHER, SHIFT_MU, SLOT_OF, SLOTS
+        lut = np.frombuffer(SLOT_OF, dtype=np.uint8).astype(np.int64)
+        s1 = np.where(codes < 128, lut[np.minimum(codes, 127)], OTHER)
+        s0 = np.empty(n, dtype=np.int64)
+        s0[0] = SLOT_OF[10]
+        s0[1:] = s1[:-1]
+        s2 = np.empty(n, dtype=np.int64)
+        s2[:-1] = s1[1:]
+        s2[-1] = OTHER
+        i2 = s1 * SLOTS + s2
+        i3 = s0 * (SLOTS * SLOTS) + i2
+
+        mu = np.frombuffer(timing.tri_mu, dtype=np.float32)[i3].astype(np.float64)
+        sigma = np.frombuffer(timing.tri_sigma, dtype=np.float32)[i3].astype(np.float64)
+        miss = np.isnan(mu)
+        mu[miss] = np.frombuffer(timing.bi_mu, dtype=np.float32)[i2[miss]]
+        sigma[miss] = np.frombuffer(timing.bi_sigma, dtype=np.float32)[i2[miss]]
+        miss = np.isnan(mu)
+        mu[miss] = 0.0
+        sigma[miss] = DEFAULT_SIGMA
+
+        # Shift for an uppercase next key
+        upper = np.zeros(n, dtype=bool)
+        upper[:-1] = (codes[1:] >= 65) & (codes[1:] <= 90)
+        for idx in np.flatnonzero(codes[1:] > 127):
+            upper[idx] = text[idx + 1].isupper()
+        mu += np.where(upper, SHIFT_MU, 0.0)
+        mu[-1], sigma[-1] = 0.0, DEFAULT_SIGMA  # Nothing follows the last key
+
+        delays = base_delay * gen.lognormal(mu, sigma)
+        delays += np.where(np.isin(codes, [ord(c) for c in '.!?\n']), gen.uniform(0.2, 0.8, n), 0.0)
+
+    else:
+        # Jitter (±40%)
+        delays = base_delay * gen.uniform(0.6, 1.4, n)
+
+        # Thinking pause after sentence ends, shorter pause between words
+        after_space = prev == ord(' ')
+        delays += np.where(after_sentence, gen.uniform(0.2, 0.8, n), 0.0)
+        delays += np.where(after_space, gen.uniform(0.02, 0.12, n), 0.0)
+
+        # Common bigrams, compared on ASCII-lowercased (prev, char) pairs
+        def ascii_lower(a):
+            return np.where((a >= 65) & (a <= 90), a + 32, a).astype(np.uint64)
+        pairs = (ascii_lower(prev) << np.uint64(32)) | ascii_lower(codes)
+        fast = np.array([(ord(b[0]) << 32) | ord(b[1]) for b in FAST_BIGRAMS], dtype=np.uint64)
+        delays *= np.where(np.isin(pairs, fast), 0.7, 1.0)
+
+    # Occasional micro-pause (cognitive hesitation)
+    delays += np.where(gen.random(n) < 0.03, gen.uniform(0.3, 1.0, n), 0.0)
+    np.maximum(delays, 0.01, out=delays)
+
+    # Occasional natural break (every ~200-500 chars)
+    delays += np.where(gen.random(n) < 0.003, gen.uniform(1.0, 3.0, n), 0.0)
+
+    # Typo rolls: letters only, never right after a sentence end
+    is_alpha = ((codes | 32) >= ord('a')) & ((codes | 32) <= ord('z'))
+    for idx in np.flatnonzero(codes > 127):
+        is_alpha[idx] = text[idx].isalpha()
+    typos = np.flatnonzero((gen.random(n) < error_rate) & is_alpha & ~after_sentence)
+
+    def extend_correct(start, stop):
+        plan.keys.frombytes(codes[start:stop].tobytes())
+        plan.actions.frombytes(bytes(stop - start))
+        plan.delays.frombytes(delays[start:stop].tobytes())
+
+    start = 0
+    for idx in typos.tolist():
+        extend_correct(start, idx)
+
+        char = text[idx]
+        next_char = text[idx + 1] if idx + 1 < n else None
+        typo_str, backspaces = generate_typo(char, next_char, rng)
+        for tc in typo_str:
+            plan.append(tc, ACTION_TYPO, base_delay * rng.uniform(0.5, 1.0))
+        plan.delays[-1] += rng.uniform(0.1, 0.4)
+        for _ in range(backspaces):
+            plan.append(BACKSPACE, ACTION_BACKSPACE, rng.uniform(0.03, 0.08))
+        plan.delays[-1] += rng.uniform(0.05, 0.15)
+
+        start = idx
+    extend_correct(start, n)
+
+    # Calibrate to the WPM, as _calibrate() does for the scalar path
+    delays = np.frombuffer(plan.delays, dtype=np.float64)
+    plan.delays = array('d', (delays * (base_delay * n / delays.sum())).tobytes())
+    return plan
+
+
+def skip_typed(events, offset, stray=0):
+    """
+    Drop events until offset correct characters have gone by (resume point).
+    stray: Uncorrected typo characters the interrupted run left in the field
+           (see checkpoint.Checkpoint); they are backspaced first.
+    """
+    events = iter(events)
+    if offset <= 0 and not stray:
+        return events
+
+    def resumed():
+        for _ in range(stray):
+            yield BACKSPACE, ACTION_BACKSPACE, random.uniform(0.03, 0.08)
+        seen = 0
+        for key, action, delay in events:
+            if seen < offset:
+                if action == ACTION_TYPE:
+                    seen += len(key)
+                continue
+            yield key, action, delay
 
-    if not (stop_event and stop_event.is_set()):
-        print(f"\n  ✅ Done! Typed {i} characters.")
+    return resumed()
 
 
-def _type_char(char):
-    """Type a single character handling special keys."""
-    if char == '\n':
-        pyautogui.press('enter')
-    elif char == '\t':
-        pyautogui.press('tab')
+# Sleep until this close to a deadline, then spin for the rest (OS sleep overshoots by ~1ms+)
+SPIN_THRESHOLD = 0.002
+
+# If we fall further behind schedule than this (e.g. the machine stalled),
+# rebase the schedule instead of bursting keys to catch up
+MAX_CATCHUP = 1.0
+
+
+def wait_until(deadline, stop_event=None):
+    """
+    Hybrid wait: coarse sleep, then a short spin on perf_counter() to hit the deadline.
+    With a stop_event the coarse part is stop_event.wait(), so setting the event
+    ends the wait immediately. Returns True if stopped.
+    """
+    remaining = deadline - time.perf_counter()
+    if remaining > SPIN_THRESHOLD:
+        if stop_event:
+            if stop_event.wait(remaining - SPIN_THRESHOLD):
+                return True
+        else:
+            time.sleep(remaining - SPIN_THRESHOLD)
+    while time.perf_counter() < deadline:
+        pass
+    return bool(stop_event and stop_event.is_set())
+
+
+def sleep_or_stop(seconds, stop_event=None):
+    """Sleep for seconds, waking early if stop_event is set. Returns True if stopped."""
+    if stop_event:
+        return stop_event.wait(seconds)
+    time.sleep(seconds)
+    return False
+
+
+class RealClock:
+    """Wall clock used for real sessions: perf_counter() and the hybrid wait_until()."""
+
+    def now(self):
+        return time.perf_counter()
+
+    def wait_until(self, deadline, stop_event=None):
+        return wait_until(deadline, stop_event)
+
+
+class VirtualClock:
+    """
+    Clock that jumps straight to each deadline instead of sleeping,
+    so a whole session 'types' instantly (benchmarks, headless checks).
+    """
+
+    def __init__(self, start=0.0):
+        self.t = start
+
+    def now(self):
+        return self.t
+
+    def wait_until(self, deadline, stop_event=None):
+        if deadline > self.t:
+            self.t = deadline
+        return bool(stop_event and stop_event.is_set())
+
+
+# In burst mode, gaps shorter than this are treated as indistinguishable and collapsed
+BURST_GAP = 0.03
+
+
+def coalesce_bursts(events, max_gap=BURST_GAP):
+    """
+    Merge runs of correct characters separated by gaps below max_gap into
+    single multi-character events. A burst's delay is the sum of the delays
+    it replaces, so overall pacing holds, and any pause of max_gap or more
+    (word gaps, thinking pauses, typo corrections) still splits bursts.
+    """
+    run = []
+    run_delay = 0.0
+
+    for key, action, delay in events:
+        if action != ACTION_TYPE:
+            if run:
+                yield ''.join(run), ACTION_TYPE, run_delay
+                run, run_delay = [], 0.0
+            yield key, action, delay
+            continue
+
+        run.append(key)
+        run_delay += delay
+        if delay >= max_gap:
+            yield ''.join(run), ACTION_TYPE, run_delay
+            run, run_delay = [], 0.0
+
+    if run:
+        yield ''.join(run), ACTION_TYPE, run_delay
+
+
+# Seconds between ETA lines printed by a DurationPacer
+ETA_EVERY = 10.0
+
+
+class DurationPacer:
+    """
+    Paces a run to finish at a target time instead of at a fixed WPM.
+    Every delay is rescaled as it is scheduled: the time left until the target
+    is shared out in proportion to the planned time left, so pauses, typo
+    corrections and stalls (incl. MAX_CATCHUP rebases) are absorbed over the
+    rest of the run and the last key lands on the target.
+    planned: Planned seconds of the events to pace, excluding the pause after the last key.
+    duration: Seconds from start() to the last key. deadline: Wall-clock time.time() instead.
+    """
+
+    def __init__(self, planned, duration=None, deadline=None, report_every=ETA_EVERY):
+        if (duration is None) == (deadline is None):
+            raise ValueError("Give either duration or deadline")
+        self.planned = planned
+        self.duration = duration
+        self.deadline = deadline
+        self.report_every = report_every
+        self.remaining = planned
+        self.end = None
+        self._next_report = None
+
+    def start(self, now):
+        """Fix the target on the executor clock; now is when the first key goes out."""
+        duration = self.duration if self.duration is not None else self.deadline - time.time()
+        self.end = now + max(0.0, duration)
+        self._next_report = now + self.report_every if self.report_every else None
+
+    def scale(self, deadline, delay):
+        """Paced version of the planned delay after a key scheduled at deadline."""
+        remaining = self.remaining
+        if remaining <= 1e-9:
+            return delay  # Pause after the last key; the target is already met
+        self.remaining -= delay
+        paced = delay * max(0.0, self.end - deadline) / remaining
+
+        if self._next_report is not None and deadline >= self._next_report:
+            self._next_report = deadline + self.report_every
+            done = 1.0 - self.remaining / self.planned if self.planned else 1.0
+            print(f"     ⏱  {done:5.1%} done | ETA {format_seconds(self.end - deadline)}", flush=True)
+        return paced
+
+    def eta(self, now):
+        """Seconds until the last key is due."""
+        return max(0.0, self.end - now) if self.end is not None else None
+
+
+def format_seconds(seconds):
+    """Format seconds as [H:]MM:SS."""
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+
+def parse_duration(value):
+    """Parse SECONDS or [H:]MM:SS into seconds."""
+    seconds = 0.0
+    for part in value.split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def parse_clock_time(value):
+    """time.time() of the next local HH:MM[:SS] (today, or tomorrow if already past)."""
+    parts = [int(p) for p in value.split(':')]
+    if len(parts) not in (2, 3):
+        raise ValueError(value)
+    now = time.localtime()
+    target = time.mktime((now.tm_year, now.tm_mon, now.tm_mday, parts[0], parts[1],
+                          parts[2] if len(parts) > 2 else 0, 0, 0, -1))
+    if target <= time.time():
+        target = time.mktime((now.tm_year, now.tm_mon, now.tm_mday + 1, parts[0], parts[1],
+                              parts[2] if len(parts) > 2 else 0, 0, 0, -1))
+    return target
+
+
+def execute_plan(plan, stop_event=None, backend=None, burst=False, clock=None, metrics=None, checkpoint=None,
+                 pacer=None, progress=None):
+    """
+    Emit a KeystrokePlan (or any iterable of (key, action, delay) events,
+    e.g. from iter_keystrokes()) into the focused window through backend.
+    Every key is scheduled against an absolute perf_counter() deadline, so backend
+    call time and sleep overshoot are absorbed instead of accumulating.
+    burst: Batch contiguous keys with tiny gaps into single backend calls (see coalesce_bursts()).
+    clock: RealClock (default) or VirtualClock to run without sleeping.
+    metrics: Optional typing_metrics.TypingMetrics recording per-key latency and timing.
+    checkpoint: Optional checkpoint.Checkpoint journaling every confirmed character
+                and any typo not yet corrected.
+    pacer: Optional DurationPacer rescaling delays to finish at a target time.
+    progress: Optional typing_metrics.LiveProgress updated after every key.
+    Returns the number of correct characters typed.
+    """
+    backend = get_backend(backend)
+    clock = clock or RealClock()
+    if burst:
+        plan = coalesce_bursts(plan)
+    typed = typos = 0
+    deadline = started = clock.now()
+    if pacer:
+        pacer.start(deadline)
+    planned_left = progress.planned if progress else None
+
+    for key, action, delay in plan:
+        # Every wait (incl. thinking pauses and natural breaks) wakes as soon as stop_event is set
+        if clock.wait_until(deadline, stop_event):
+            break
+
+        if metrics:
+            emitted = clock.now()
+
+        if action == ACTION_BACKSPACE:
+            backend.backspace()
+            if checkpoint:
+                checkpoint.backspace()
+        elif action == ACTION_NAV:
+            backend.hotkey(*NAV_KEYS[key])
+        else:
+            backend.write(key)
+            if action == ACTION_TYPE:
+                typed += len(key)
+                if checkpoint:
+                    checkpoint.confirm(typed)
+            else:
+                typos += len(key)
+                if checkpoint:
+                    checkpoint.typo(len(key))
+
+        if pacer:
+            delay = pacer.scale(deadline, delay)
+
+        if metrics:
+            metrics.record(key, action, delay, deadline, emitted, clock.now())
+
+        # Next deadline is relative to the schedule, not to when this key finished,
+        # so small drift is caught up on the following keys
+        deadline += delay
+        lag = clock.now() - deadline
+        if lag > MAX_CATCHUP:
+            deadline += lag
+
+        if progress:
+            if pacer:
+                eta = pacer.eta(deadline)
+            elif planned_left is not None:
+                planned_left -= delay
+                eta = max(0.0, planned_left)
+            else:
+                eta = None
+            progress.update(typed, typos, clock.now() - started, eta)
+
+    return typed
+
+
+# ──────────────────────────────────────────────────────
+# Planner -> injector pipeline
+# ──────────────────────────────────────────────────────
+
+# Batches of events buffered between the planning thread and the injector
+PIPELINE_DEPTH = 64
+
+# Events per batch. Small batches keep each planner burst short, so it holds
+# the GIL only briefly when it wakes up to refill the queue.
+PIPELINE_BATCH = 32
+
+_PIPELINE_END = object()
+
+
+def pipeline_events(events, depth=PIPELINE_DEPTH, batch_size=PIPELINE_BATCH, metrics=None):
+    """
+    Run the events generator (e.g. iter_keystrokes()) on a planning thread that
+    fills a bounded queue, and yield its events on the calling (injector) thread.
+    Backpressure: when depth batches are waiting the planner blocks until the
+    injector catches up, so memory stays bounded. Queue depth, planner
+    blocking (backpressure) and injector starvation are reported to metrics.
+    """
+    import queue
+    import threading
+
+    q = queue.Queue(maxsize=depth)
+    consumer_gone = threading.Event()
+
+    if metrics:
+        metrics.queue_capacity = depth
+
+    def put(item):
+        try:
+            q.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+        started = time.perf_counter()
+        while not consumer_gone.is_set():
+            try:
+                q.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            if metrics:
+                metrics.record_backpressure(time.perf_counter() - started)
+            return True
+        return False
+
+    def produce():
+        try:
+            batch = []
+            for event in events:
+                batch.append(event)
+                if len(batch) >= batch_size:
+                    if not put(batch):
+                        return
+                    batch = []
+            if batch and not put(batch):
+                return
+            put(_PIPELINE_END)
+        except Exception as e:
+            put(e)
+
+    threading.Thread(target=produce, name='human-typer-planner', daemon=True).start()
+
+    try:
+        while True:
+            try:
+                item = q.get_nowait()
+            except queue.Empty:
+                started = time.perf_counter()
+                item = q.get()
+                if metrics:
+                    metrics.record_starvation(time.perf_counter() - started)
+            if metrics:
+                metrics.observe_queue(q.qsize())
+
+            if item is _PIPELINE_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield from item
+    finally:
+        consumer_gone.set()
+
+
+# ──────────────────────────────────────────────────────
+# Typing session
+# ──────────────────────────────────────────────────────
+
+def type_text(text, wpm=60, error_rate=0.06, start_delay=3, stop_event=None, suppress_indent=False, seed=None,
+              backend=None, burst=False, vectorized=False, metrics=None, queue_depth=PIPELINE_DEPTH,
+              checkpoint=None, resume_from=0, resume_stray=0, duration=None, deadline=None, timing=None,
+              progress=None, special_chars=None):
+    """
+    Types text into the currently focused window with human-like behavior.
+    Makes typos and corrects them. Final output is 100% correct.
+    Supports a stop_event to interrupt typing.
+    text: A str, a file-like object / iterable of str chunks to stream,
+          or a prebuilt KeystrokePlan (e.g. KeystrokePlan.load()) which is replayed as-is.
+    suppress_indent: If True, skips leading whitespace of new lines (useful for IDEs that auto-indent).
+    seed: Optional RNG seed for a reproducible session.
+    backend: Keystroke backend name (see keystroke_backends.BACKENDS) or instance; default pyautogui.
+    vectorized: If True, plan with NumPy (see plan_keystrokes_vectorized()).
+    burst: If True, inject runs of keys closer together than BURST_GAP as one batch (high-volume jobs).
+    metrics: Optional typing_metrics.TypingMetrics to instrument the run.
+    queue_depth: Event batches buffered between planner and injector threads when streaming.
+    checkpoint: Optional checkpoint.Checkpoint journaling progress so the run can be resumed.
+    resume_from: Skip this many correct characters (offset from a checkpoint). The seed and
+                 parameters must match the original run for the rest of the session to line up.
+    resume_stray: Uncorrected typo characters the interrupted run left (from the checkpoint),
+                  deleted before typing on.
+    duration: Finish in this many seconds (from the first key) instead of pacing by wpm;
+              wpm then only shapes the rhythm. See DurationPacer.
+    deadline: Like duration, but finish at this time.time() timestamp.
+    timing: Optional timing_model.TimingModel for data-driven key rhythm.
+    progress: Optional typing_metrics.LiveProgress for a live readout on another thread;
+              its total and planned time are filled in here when the plan is known up front.
+    special_chars: Non-ASCII characters of a streamed text (see non_ascii_chars()), mapped by the
+                   backend before the countdown as those of a plan are.
+    """
+    replay = isinstance(text, KeystrokePlan)
+    streaming = not replay and not isinstance(text, str)
+    paced = duration is not None or deadline is not None
+
+    if replay:
+        wpm = text.meta.get('wpm', wpm)
+        error_rate = text.meta.get('error_rate', error_rate)
+        length = f"{text.typed_chars} characters (preplanned)"
+    else:
+        length = 'streaming' if streaming else f'{len(text)} characters'
+
+    print(f"\n{'='*60}")
+    print(f"  HUMAN TYPER")
+    print(f"  Speed: ~{wpm} WPM | Error rate: {error_rate*100:.0f}%")
+    print(f"  Text length: {length}")
+    if seed is not None:
+        print(f"  Seed: {seed}")
+    print(f"{'='*60}")
+
+    if replay:
+        plan = text
+    elif streaming and not vectorized and not paced:
+        # Plan lazily on a separate thread alongside typing, so memory stays flat for any
+        # input size and no planning work runs between keystrokes on the injector thread
+        plan = pipeline_events(
+            iter_keystrokes(text, wpm=wpm, error_rate=error_rate, suppress_indent=suppress_indent, seed=seed,
+                            timing=timing),
+            depth=queue_depth, metrics=metrics)
+    else:
+        # Plan the whole session up front so no RNG or typo work happens between keystrokes
+        # (and, when pacing to a duration, so the total planned time is known)
+        plan = plan_keystrokes(text, wpm=wpm, error_rate=error_rate, suppress_indent=suppress_indent, seed=seed,
+                               vectorized=vectorized, timing=timing)
+
+    # Characters the backend has no key for are found up front (in the plan, or by the
+    # caller for a streamed text), so it can map them before the countdown
+    if isinstance(plan, KeystrokePlan):
+        special_chars = plan.non_ascii()
+
+    if progress is not None and isinstance(plan, KeystrokePlan):
+        progress.total = plan.typed_chars - resume_from
+        if not resume_from:
+            progress.planned = plan.duration
+
+    if resume_from or resume_stray:
+        plan = skip_typed(plan, resume_from, resume_stray)
+    if resume_from:
+        print(f"  ⏩ Resuming after character {resume_from}")
+    if resume_stray:
+        print(f"  ⌫  Deleting {resume_stray} uncorrected typo character(s) first")
+
+    pacer = None
+    if paced:
+        if not isinstance(plan, KeystrokePlan):
+            rest = KeystrokePlan(getattr(text, 'meta', None))
+            for key, action, delay in plan:
+                rest.append(key, action, delay)
+            plan = rest
+        planned = plan.duration - plan.delays[-1] if len(plan) else 0.0
+        pacer = DurationPacer(planned, duration=duration, deadline=deadline)
+        target = duration if duration is not None else deadline - time.time()
+        print(f"  ⏱  Target: {format_seconds(target)} (planned {format_seconds(planned)} at {wpm} WPM)")
+        if target < planned / 4:
+            print(f"  ⚠️  That is over 4x faster than planned; typing will not look human.")
+
+    # Set up the backend before the countdown so its startup cost isn't paid on the first key
+    owns_backend = not isinstance(backend, KeystrokeBackend)
+    backend = get_backend(backend)
+    if special_chars:
+        backend.prepare(special_chars)
+
+    if start_delay > 0:
+        print(f"\n  ⏳ Typing starts in {start_delay} seconds...")
+        print(f"  👉 Click on the target window/field NOW!\n")
+
+        # Countdown
+        for i in range(start_delay, 0, -1):
+            print(f"     {i}...")
+            if sleep_or_stop(1, stop_event):
+                print("🛑 Typing cancelled before start.")
+                if owns_backend:
+                    backend.close()
+                if checkpoint:
+                    checkpoint.close()
+                return
+            
+    print(f"     ✏️  Typing!\n")
+
+    started = time.perf_counter()
+    try:
+        typed = execute_plan(plan, stop_event, backend, burst=burst, metrics=metrics, checkpoint=checkpoint,
+                             pacer=pacer, progress=progress)
+    finally:
+        if owns_backend:
+            backend.close()
+    if checkpoint:
+        checkpoint.close(completed=not (stop_event and stop_event.is_set()))
+    elapsed = time.perf_counter() - started
+
+    if stop_event and stop_event.is_set():
+        print("\n🛑 Typing interrupted by user.")
     else:
-        pyautogui.typewrite(char, interval=0) if char in string.printable and char not in '\t\n\r\x0b\x0c' else pyautogui.press(char)
+        achieved_wpm = (typed / 5) / (elapsed / 60) if elapsed > 0 else 0
+        print(f"\n  ✅ Done! Typed {typed} characters in {elapsed:.1f}s (~{achieved_wpm:.0f} WPM).")
 
 
 # ──────────────────────────────────────────────────────
 # CLI
 # ──────────────────────────────────────────────────────
 
+def load_timing_model(path):
+    """TimingModel from path, None without one; exits with a message if it can't be read."""
+    if not path:
+        return None
+    from timing_model import TimingModel
+    try:
+        return TimingModel.load(path)
+    except (OSError, ValueError) as e:
+        print(f"❌ Cannot load timing model: {e}")
+        sys.exit(1)
+
+
+def run_batch(args):
+    """--batch: plan every file in args.batch to a session file, in parallel."""
+    import os
+    from batch_planner import plan_batch, session_path
+
+    if args.vectorized:
+        print("❌ --batch plans with the standard planner; drop --vectorized.")
+        sys.exit(1)
+    try:
+        paths = [os.path.join(args.batch, name) for name in sorted(os.listdir(args.batch))
+                 if os.path.isfile(os.path.join(args.batch, name)) and not name.endswith('.hts')]
+    except OSError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if not paths:
+        print(f"❌ No files to plan in: {args.batch}")
+        sys.exit(1)
+
+    out_dir = args.output or args.batch
+    jobs = args.jobs or os.cpu_count() or 1
+    print(f"🗂  Planning {len(paths)} file(s) from {args.batch} on {jobs} process(es)...")
+
+    def done(path, plan):
+        print(f"  📋 {os.path.basename(path)}: {len(plan)} keystrokes, ~{format_seconds(plan.duration)} "
+              f"(seed {plan.meta['seed']}) -> {session_path(out_dir, path)}")
+
+    started = time.perf_counter()
+    try:
+        keys = plan_batch(paths, out_dir, wpm=args.wpm, error_rate=args.error_rate, seed=args.seed,
+                          timing=load_timing_model(args.timing_model), jobs=jobs, on_done=done)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"\n  ✅ Planned {keys} keystrokes in {time.perf_counter() - started:.1f}s.")
+
+
 def main():
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Human Typer — Types text into any window like a real human, with typos and corrections.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -305,14 +1327,74 @@ Examples:
     parser.add_argument('--wpm', type=int, default=60, help='Words per minute (default: 60)')
     parser.add_argument('--error-rate', type=float, default=0.06, help='Typo probability 0.0-1.0 (default: 0.06)')
     parser.add_argument('--delay', type=int, default=3, help='Seconds before typing starts (default: 3)')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=DEFAULT_BACKEND,
+                        help=f'Keystroke backend (default: {DEFAULT_BACKEND}; xtest = native X11, Linux only)')
+    pace = parser.add_mutually_exclusive_group()
+    pace.add_argument('--duration', type=parse_duration, metavar='TIME',
+                      help='Finish in TIME (SECONDS or [H:]MM:SS) from the first key; --wpm only shapes the rhythm')
+    pace.add_argument('--deadline', type=parse_clock_time, metavar='HH:MM',
+                      help='Finish at this local time (today, or tomorrow if already past)')
+    parser.add_argument('--metrics', metavar='FILE',
+                        help='Write run metrics to FILE (.prom/.txt = Prometheus text, otherwise JSON)')
+    parser.add_argument('--vectorized', action='store_true',
+                        help='Plan the session with NumPy (fast for very large texts; needs numpy)')
+    parser.add_argument('--burst', action='store_true',
+                        help=f'Batch keys typed less than {BURST_GAP*1000:.0f}ms apart into single injections (high WPM)')
+    parser.add_argument('--queue-depth', type=int, default=PIPELINE_DEPTH,
+                        help=f'Event batches buffered between planner and injector when streaming (default: {PIPELINE_DEPTH})')
+    parser.add_argument('--timing-model', metavar='FILE',
+                        help='Bigram/trigram timing table built with timing_model.py (default: built-in rhythm)')
+    parser.add_argument('--seed', type=int, help='RNG seed for a reproducible session')
+    parser.add_argument('--record', metavar='FILE', help='Save the planned session to FILE before typing it')
+    parser.add_argument('--replay', metavar='FILE', help='Type a session saved with --record, exactly as recorded')
+    parser.add_argument('--plan-only', action='store_true',
+                        help='Plan (and --record) the session, print a summary and exit without typing')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted run of the same text from its last confirmed character')
+    parser.add_argument('--checkpoint', metavar='FILE',
+                        help='Progress journal file (default: ~/.cache/human_typer/checkpoint.json)')
+    parser.add_argument('--no-checkpoint', action='store_true', help='Do not journal progress')
+    parser.add_argument('--retype', metavar='OLD_FILE',
+                        help='The field already holds OLD_FILE (or its checkpointed part); '
+                             'move the cursor and type only the edits that turn it into the new text')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use the on-disk plan cache for seeded runs')
+    parser.add_argument('--cache-dir', help='Plan cache directory (default: ~/.cache/human_typer/plans)')
+    parser.add_argument('--export', choices=['xdotool'],
+                        help='Write the session as a script for a native tool instead of typing it')
+    parser.add_argument('-o', '--output', metavar='PATH',
+                        help='File for --export (default: stdout), or directory for --batch (default: DIR)')
+    parser.add_argument('--batch', metavar='DIR',
+                        help='Plan every file NAME in DIR to a NAME.hts session file (type one with --replay), then exit')
+    parser.add_argument('--jobs', type=int, metavar='N',
+                        help='Planning processes (default: one per CPU for --batch, 1 otherwise)')
 
     args = parser.parse_args()
 
+    if args.batch:
+        run_batch(args)
+        return
+
+    if args.export and args.deadline is not None:
+        parser.error('--deadline depends on when the script runs; use --duration with --export')
+    script_out = None
+    if args.export and not args.output:
+        # The script goes to stdout, so messages go to stderr
+        script_out, sys.stdout = sys.stdout, sys.stderr
+
     # Get the text
-    if args.file:
-        with open(args.file, 'r', encoding='utf-8') as f:
-            text = f.read()
-        print(f"📄 Loaded {len(text)} characters from: {args.file}")
+    if args.replay:
+        text = KeystrokePlan.load(args.replay)
+        print(f"🔁 Replaying {len(text)} recorded keystrokes from: {args.replay}")
+
+    elif args.file:
+        # Stream the file instead of loading it; peek at the first chunk to reject empty files
+        chunks = read_file_chunks(args.file)
+        first = next(chunks, '')
+        if not first.strip():
+            print("❌ No text provided. Exiting.")
+            sys.exit(1)
+        text = itertools.chain([first], chunks)
+        print(f"📄 Streaming from: {args.file}")
 
     elif args.text:
         text = args.text
@@ -335,12 +1417,138 @@ Examples:
                 break
         text = '\n'.join(lines)
 
-    if not text.strip():
+    if isinstance(text, str) and not text.strip():
         print("❌ No text provided. Exiting.")
         sys.exit(1)
 
-    type_text(text, wpm=args.wpm, error_rate=args.error_rate, start_delay=args.delay)
+    timing = load_timing_model(args.timing_model)
+    seed = args.seed
+    cacheable = seed is not None
+    resume_from = resume_stray = 0
+    digest = None
+
+    if args.retype and not args.replay:
+        from retype import plan_retype
+        with open(args.retype, 'r', encoding='utf-8', newline='') as f:
+            typed = f.read()
+        if not args.no_checkpoint:
+            # An interrupted run of the old text only got as far as its checkpoint
+            from checkpoint import load_checkpoint, text_digest
+            state = load_checkpoint(args.checkpoint)
+            if state and state['digest'] == text_digest(typed):
+                typed = prepare_text(typed)[:state['offset']]
+                resume_stray = state['stray']
+                print(f"⏩ Field holds the first {state['offset']} characters of: {args.retype}")
+        if not isinstance(text, str):
+            text = ''.join(text)
+        text = plan_retype(typed, text, wpm=args.wpm, error_rate=args.error_rate, seed=seed, timing=timing)
+        print(f"✂️  Retype: {len(text)} keystrokes, {text.typed_chars} characters to type")
+
+    if not (args.replay or args.retype or args.plan_only or args.export or args.no_checkpoint):
+        from checkpoint import load_checkpoint, text_digest
+        # Files get an extra streaming pass for the digest; memory stays flat
+        digest = text_digest(read_file_chunks(args.file) if args.file else text)
+
+        if args.resume:
+            state = load_checkpoint(args.checkpoint)
+            if not state or state['digest'] != digest:
+                print("❌ No checkpoint found for this text. Exiting.")
+                sys.exit(1)
+            # Same parameters and seed as the interrupted run, so the rest of the session lines up
+            params = state['params']
+            args.wpm, args.error_rate, args.vectorized = params['wpm'], params['error_rate'], params['vectorized']
+            if params.get('timing_model') != args.timing_model:
+                args.timing_model = params.get('timing_model')
+                timing = load_timing_model(args.timing_model)
+            seed = params['seed']
+            resume_from, resume_stray = state['offset'], state['stray']
+        elif seed is None:
+            # A concrete seed lets a resumed run continue the exact same session
+            seed = random.randrange(2 ** 32)
+
+    # An export streams unless it needs the total planned time to fit a --duration
+    plan_up_front = args.record or args.plan_only or (args.export and (args.duration or args.vectorized))
+    if (cacheable or plan_up_front) and not isinstance(text, KeystrokePlan):
+        if cacheable and not args.no_cache:
+            # Seeded plans are deterministic, so repeat jobs load them from the cache instead of re-planning
+            from plan_cache import PlanCache
+            reopen = (lambda: read_file_chunks(args.file)) if args.file else None
+            text, hit = PlanCache(args.cache_dir).get_or_plan(
+                text, wpm=args.wpm, error_rate=args.error_rate, suppress_indent=False,
+                seed=seed, vectorized=args.vectorized, reopen=reopen, timing=timing, jobs=args.jobs or 1)
+            if hit:
+                print("⚡ Loaded plan from cache")
+        else:
+            text = plan_keystrokes(text, wpm=args.wpm, error_rate=args.error_rate, suppress_indent=False,
+                                   seed=seed, vectorized=args.vectorized, timing=timing, jobs=args.jobs or 1)
+    if args.record and not args.replay:
+        text.save(args.record)
+        print(f"💾 Recorded {len(text)} keystrokes to: {args.record}")
+
+    if args.plan_only:
+        print(f"📋 Plan: {len(text)} keystrokes, {text.typed_chars} characters, "
+              f"~{text.duration:.1f}s planned")
+        return
+
+    if args.export:
+        from plan_export import EXPORT_FORMATS
+        events = text if isinstance(text, KeystrokePlan) else iter_keystrokes(
+            text, wpm=args.wpm, error_rate=args.error_rate, seed=seed, timing=timing)
+        scale = 1.0
+        if args.duration is not None and len(events):
+            planned = events.duration - events.delays[-1]
+            scale = args.duration / planned if planned > 0 else 1.0
+        write = EXPORT_FORMATS[args.export]
+        if script_out:
+            keys = write(events, script_out, start_delay=args.delay, scale=scale)
+            script_out.flush()
+        else:
+            with open(args.output, 'w', encoding='utf-8', newline='\n') as f:
+                keys = write(events, f, start_delay=args.delay, scale=scale)
+            import os
+            os.chmod(args.output, os.stat(args.output).st_mode | 0o111)
+        print(f"📜 Exported {keys} keystrokes as an {args.export} script to: {args.output or 'stdout'}")
+        return
+
+    try:
+        backend = get_backend(args.backend)
+    except (ImportError, OSError) as e:
+        print("=" * 60)
+        print(f"  Cannot start the {args.backend} backend:")
+        print(f"  {e}")
+        print("=" * 60)
+        sys.exit(1)
+
+    metrics = None
+    if args.metrics:
+        from typing_metrics import TypingMetrics
+        metrics = TypingMetrics()
+
+    checkpoint = None
+    if digest:
+        from checkpoint import Checkpoint
+        params = {'wpm': args.wpm, 'error_rate': args.error_rate, 'suppress_indent': False,
+                  'seed': seed, 'vectorized': args.vectorized, 'timing_model': args.timing_model}
+        checkpoint = Checkpoint(digest, params, offset=resume_from, path=args.checkpoint, stray=resume_stray)
+
+    special_chars = None
+    if args.file and not isinstance(text, KeystrokePlan):
+        # Streamed: one cheap pass over the file finds what the backend has to map up front
+        special_chars = non_ascii_chars(read_file_chunks(args.file))
+
+    type_text(text, wpm=args.wpm, error_rate=args.error_rate, start_delay=args.delay, backend=backend,
+              burst=args.burst, vectorized=args.vectorized, metrics=metrics, seed=seed,
+              queue_depth=args.queue_depth, checkpoint=checkpoint, resume_from=resume_from,
+              resume_stray=resume_stray, duration=args.duration, deadline=args.deadline, timing=timing,
+              special_chars=special_chars)
+    backend.close()
+
+    if metrics:
+        metrics.write(args.metrics)
+        print(f"  📊 Metrics written to: {args.metrics}")
 
 
 if __name__ == '__main__':
+    # Helper modules import human_typer; make them share this module instead of loading a second copy
+    sys.modules.setdefault('human_typer', sys.modules[__name__])
     main()
@@ -1,27 +1,37 @@
 import customtkinter as ctk
 import threading
-import time
 import sys
+import os
 import platform
-import human_typer  # Import the logic from the CLI script
+import human_typer  # Import the logic from the CLI script (light: backends load on first use)
 
 # Platform-aware hotkey handling
 # `keyboard` requires root on macOS; `pynput` works with Accessibility permissions
 IS_MACOS = sys.platform == "darwin"
 
-if IS_MACOS:
-    try:
-        from pynput import keyboard as pynput_keyboard
-    except ImportError:
-        pynput_keyboard = None
-        print("WARNING: pynput not installed. Stop hotkey will not work on macOS.")
-        print("Install it with: pip3 install pynput")
-else:
-    try:
-        import keyboard
-    except ImportError:
-        keyboard = None
-        print("WARNING: keyboard not installed. Stop hotkey will not work.")
+_hotkey_module = False  # Not loaded yet
+
+
+def get_hotkey_module():
+    """Import the hotkey library on first use instead of at startup. Returns None if missing."""
+    global _hotkey_module
+    if _hotkey_module is not False:
+        return _hotkey_module
+
+    if IS_MACOS:
+        try:
+            from pynput import keyboard as _hotkey_module
+        except ImportError:
+            _hotkey_module = None
+            print("WARNING: pynput not installed. Stop hotkey will not work on macOS.")
+            print("Install it with: pip3 install pynput")
+    else:
+        try:
+            import keyboard as _hotkey_module
+        except ImportError:
+            _hotkey_module = None
+            print("WARNING: keyboard not installed. Stop hotkey will not work.")
+    return _hotkey_module
 
 # Theme Definitions (Light, Dark)
 # Light = Natural Flow (Cream/Sage)
@@ -40,12 +50,24 @@ COLOR_TRACK = ("#E0E0E0", "#2C3E30")    # Light Gray / Darker Jungle
 ctk.set_appearance_mode("Light")
 ctk.set_default_color_theme("green")
 
+# Live stats refresh interval while typing (~10 fps). The UI samples the engine's
+# progress at this rate instead of being called back once per key.
+FRAME_MS = 100
+
+# Longest message shown in the status field
+STATUS_CHARS = 48
+
+# Documents are typed straight from disk and only their head is shown in the textbox.
+# Pastes longer than LARGE_PASTE_CHARS take the same path via a temporary file.
+PREVIEW_CHARS = 20_000
+LARGE_PASTE_CHARS = 200_000
+
 class HumanTyperApp(ctk.CTk):
     def __init__(self):
         super().__init__()
 
         self.title("Human Typer - Natural Flow v2.0")
-        self.geometry("450x780") 
+        self.geometry("450x860") 
         self.resizable(False, True)
         
         # Icon (Windows only — .ico not supported on macOS)
@@ -132,14 +154,31 @@ class HumanTyperApp(ctk.CTk):
         self.bar_target.set(1)
         self.bar_target.pack(fill="x", padx=15, pady=(5, 15))
 
+        # Live Stats Card (sampled every FRAME_MS while typing)
+        self.card_stats = ctk.CTkFrame(self.cards_frame, fg_color=COLOR_CARD, corner_radius=20)
+        self.card_stats.grid(row=1, column=0, columnspan=2, pady=(10, 0), sticky="ew")
+        self.stat_labels = {}
+        for col, (key, title) in enumerate((("typed", "TYPED"), ("typos", "TYPOS"), ("wpm", "WPM"), ("eta", "ETA"))):
+            self.card_stats.grid_columnconfigure(col, weight=1)
+            ctk.CTkLabel(self.card_stats, text=title, font=self.font_body, text_color=COLOR_MUTED).grid(
+                row=0, column=col, padx=10, pady=(10, 0))
+            self.stat_labels[key] = ctk.CTkLabel(self.card_stats, text="-", font=self.font_label, text_color=COLOR_TEXT)
+            self.stat_labels[key].grid(row=1, column=col, padx=10, pady=(0, 10))
+
         # --- PREVIEW AREA ---
         self.lbl_preview = ctk.CTkLabel(self, text="<>  Input Text", font=self.font_body, text_color=COLOR_MUTED)
         self.lbl_preview.grid(row=2, column=0, padx=30, pady=(20, 5), sticky="w")
 
+        self.btn_open = ctk.CTkButton(self, text="Open File", width=80, height=26, font=self.font_body,
+                                      fg_color=COLOR_CARD, text_color=COLOR_TEXT, hover_color=COLOR_TRACK,
+                                      corner_radius=13, command=self.toggle_file)
+        self.btn_open.grid(row=2, column=0, padx=30, pady=(20, 5), sticky="e")
+
         self.text_area = ctk.CTkTextbox(self, width=400, height=150, corner_radius=20, 
                                         fg_color=COLOR_CARD, text_color=COLOR_TEXT, font=self.font_code, border_width=0)
         self.text_area.grid(row=3, column=0, padx=20, pady=0, sticky="nsew")
         self.text_area.insert("0.0", "Paste your text here...")
+        self.text_area.bind("<<Paste>>", self.on_paste)
 
         # --- CONTROLS CARD ---
         self.controls_card = ctk.CTkFrame(self, fg_color=COLOR_CARD, corner_radius=25)
@@ -181,11 +220,17 @@ class HumanTyperApp(ctk.CTk):
                                           fg_color=COLOR_PRIMARY, text_color=COLOR_TEXT, hover_color=COLOR_PRIMARY)
         self.chk_indent.pack(side="left", padx=20, pady=10)
 
-        # --- BUTTONS ROW: START + STOP ---
+        # Seed: same seed + same text = identical session (typos, pauses)
+        self.entry_seed = ctk.CTkEntry(self.settings_frame, width=90, placeholder_text="Seed", font=self.font_body,
+                                       fg_color=COLOR_CARD, text_color=COLOR_TEXT, border_width=0, corner_radius=8)
+        self.entry_seed.pack(side="right", padx=20, pady=10)
+
+        # --- BUTTONS ROW: START + RESUME + STOP ---
         self.btn_row = ctk.CTkFrame(self, fg_color="transparent")
         self.btn_row.grid(row=6, column=0, padx=30, pady=10, sticky="ew")
         self.btn_row.grid_columnconfigure(0, weight=3)
         self.btn_row.grid_columnconfigure(1, weight=1)
+        self.btn_row.grid_columnconfigure(2, weight=1)
 
         self.btn_start = ctk.CTkButton(self.btn_row, text="START SESSION", height=55, corner_radius=27,
                                        font=ctk.CTkFont(family=_font_ui, size=16, weight="bold"),
@@ -193,11 +238,17 @@ class HumanTyperApp(ctk.CTk):
                                        command=self.start_typing_thread)
         self.btn_start.grid(row=0, column=0, padx=(0, 8), sticky="ew")
 
+        self.btn_resume = ctk.CTkButton(self.btn_row, text="RESUME", height=55, corner_radius=27,
+                                        font=ctk.CTkFont(family=_font_ui, size=14, weight="bold"),
+                                        fg_color=COLOR_SECONDARY, hover_color="#A88B6C", text_color="#FFFFFF",
+                                        command=lambda: self.start_typing_thread(resume=True))
+        self.btn_resume.grid(row=0, column=1, padx=(0, 8), sticky="ew")
+
         self.btn_stop = ctk.CTkButton(self.btn_row, text="STOP", height=55, corner_radius=27,
                                       font=ctk.CTkFont(family=_font_ui, size=14, weight="bold"),
                                       fg_color=COLOR_ERROR, hover_color="#B03030", text_color="#FFFFFF",
                                       command=self.stop_typing, state="disabled")
-        self.btn_stop.grid(row=0, column=1, sticky="ew")
+        self.btn_stop.grid(row=0, column=2, sticky="ew")
 
         # Footer
         self.lbl_footer = ctk.CTkLabel(self, text="Natural Typing Environment", font=ctk.CTkFont(size=10), text_color=COLOR_MUTED)
@@ -206,6 +257,15 @@ class HumanTyperApp(ctk.CTk):
         # Logic
         self.typing_thread = None
         self.stop_event = threading.Event()
+        self.progress = None  # typing_metrics.LiveProgress of the running session
+        self.poll_job = None
+        self.source_file = None  # Loaded document: {"path", "chars", "chars_no_indent", "special_chars", "digest", "temp"}
+        self.loading = False
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        self.close_file()  # Removes a temporary paste file
+        self.destroy()
 
     def toggle_theme(self):
         if self.theme_mode == "Light":
@@ -237,87 +297,350 @@ class HumanTyperApp(ctk.CTk):
     def update_var_label(self, value):
         self.lbl_var_val.configure(text=f"{value*100:.1f} %")
 
-    def start_typing_thread(self):
-        if self.typing_thread and self.typing_thread.is_alive():
+    # --- Large documents: typed from disk, previewed in a window ---
+
+    def toggle_file(self):
+        if self.loading or (self.typing_thread and self.typing_thread.is_alive()):
             return
-        
-        text = self.text_area.get("0.0", "end")
-        if "Paste your text here..." in text and len(text) < 40:
-             if text.strip() == "Paste your text here...":
+        if self.source_file:
+            self.close_file()
+            return
+        from tkinter import filedialog
+        path = filedialog.askopenfilename(title="Open text file",
+                                          filetypes=[("Text files", "*.txt *.md *.py *.csv"), ("All files", "*")])
+        if path:
+            self.load_file(path)
+
+    def on_paste(self, event):
+        """Huge pastes would freeze the textbox; spill them to a temporary file and load that instead."""
+        if self.source_file or self.loading:
+            return "break"
+        try:
+            text = self.clipboard_get()
+        except Exception:
+            return None
+        if len(text) < LARGE_PASTE_CHARS:
+            return None  # Normal paste
+
+        def spill():
+            import tempfile
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", newline="", suffix=".txt",
+                                             prefix="human_typer_", delete=False) as f:
+                f.write(text)
+            return f.name
+
+        self.load_file(spill, temp=True)
+        return "break"
+
+    def load_file(self, path, temp=False):
+        """
+        Scan a document on a background thread: character count, checkpoint digest and
+        the first PREVIEW_CHARS for the textbox, in one streaming pass.
+        path: File path, or a callable run first on the thread that returns one (temp spill).
+        """
+        self.loading = True
+        self.btn_open.configure(state="disabled")
+        self.btn_start.configure(state="disabled")
+        self.btn_resume.configure(state="disabled")
+        self.lbl_status_val.configure(text="Loading...", text_color=COLOR_SECONDARY)
+        threading.Thread(target=self.scan_file, args=(path, temp), daemon=True).start()
+
+    def scan_file(self, path, temp):
+        from checkpoint import text_digest
+
+        # Characters as typed (see prepare_chunks()): as is, and with Anti-Double Indent
+        stats = {"chars": 0, "chars_no_indent": 0, "blank": True}
+        special_chars = set()  # Non-ASCII, for the backend to map before typing (see backend.prepare())
+        head = []
+
+        def as_is(piece):
+            if stats["chars"] < PREVIEW_CHARS:
+                head.append(piece[:PREVIEW_CHARS - stats["chars"]])
+            stats["chars"] += len(piece)
+            if stats["blank"] and piece.strip():
+                stats["blank"] = False
+            if not piece.isascii():
+                special_chars.update(human_typer.non_ascii_chars(piece))
+
+        def no_indent(piece):
+            stats["chars_no_indent"] += len(piece)
+
+        def prepared(chunks, suppress_indent, visit):
+            """Pass the raw chunks through, visiting what prepare_chunks() makes of them on the way."""
+            seen = []
+
+            def tap():
+                for chunk in chunks:
+                    seen.append(chunk)
+                    yield chunk
+
+            for piece in human_typer.prepare_chunks(tap(), suppress_indent):
+                visit(piece)
+                yield from seen
+                seen.clear()
+            yield from seen
+
+        try:
+            if callable(path):
+                path = path()
+            # The digest is of the raw file, like the CLI's, so checkpoints work across both
+            digest = text_digest(prepared(prepared(human_typer.read_file_chunks(path), False, as_is),
+                                          True, no_indent))
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Could not load file: {e}")
+            self.discard_temp(path, temp)
+            self.ui(lambda: self.file_loaded(None, "Can't Read File"))
+            return
+
+        if stats["blank"]:
+            self.discard_temp(path, temp)
+            self.ui(lambda: self.file_loaded(None, "No Text!"))
+            return
+        source = {"path": path, "chars": stats["chars"], "chars_no_indent": stats["chars_no_indent"],
+                  "special_chars": special_chars, "digest": digest, "temp": temp}
+        self.ui(lambda: self.file_loaded(source, "".join(head)))
+
+    @staticmethod
+    def discard_temp(path, temp):
+        """Remove a temporary paste file that won't be loaded."""
+        if temp and isinstance(path, str):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def file_loaded(self, source, preview):
+        """Main thread: show the preview window of a scanned document (or the error in preview)."""
+        self.loading = False
+        self.btn_open.configure(state="normal")
+        self.btn_start.configure(state="normal")
+        self.btn_resume.configure(state="normal")
+        if source is None:
+            self.lbl_status_val.configure(text=preview, text_color=COLOR_ERROR)
+            return
+
+        self.close_file()
+        self.source_file = source
+        hidden = source["chars"] - len(preview)
+        if hidden > 0:
+            preview += f"\n\n[... {hidden:,} more characters, typed from the file ...]"
+        self.text_area.delete("1.0", "end")
+        self.text_area.insert("1.0", preview)
+        self.text_area.configure(state="disabled")
+        self.btn_open.configure(text="Close File")
+        self.lbl_preview.configure(text=f"<>  {os.path.basename(source['path'])} ({source['chars']:,} chars)")
+        self.lbl_status_val.configure(text="File Loaded", text_color=COLOR_PRIMARY)
+
+    def close_file(self):
+        """Back to typing what is in the textbox."""
+        source, self.source_file = self.source_file, None
+        if source is None:
+            return
+        self.discard_temp(source["path"], source["temp"])
+        self.text_area.configure(state="normal")
+        self.text_area.delete("1.0", "end")
+        self.btn_open.configure(text="Open File")
+        self.lbl_preview.configure(text="<>  Input Text")
+
+    def start_typing_thread(self, resume=False):
+        if self.loading or (self.typing_thread and self.typing_thread.is_alive()):
+            return
+
+        source = self.source_file
+        if source:
+            # Typed straight from the file; the textbox only holds a preview
+            text = None
+        else:
+            # "end-1c" skips Tk's implicit trailing newline, so rstrip() below usually returns the same str
+            text = self.text_area.get("1.0", "end-1c")
+            if "Paste your text here..." in text and len(text) < 40:
+                 if text.strip() == "Paste your text here...":
+                     self.lbl_status_val.configure(text="No Text!", text_color=COLOR_ERROR)
+                     return
+
+            if not text.strip():
                  self.lbl_status_val.configure(text="No Text!", text_color=COLOR_ERROR)
                  return
-        
-        if not text.strip():
-             self.lbl_status_val.configure(text="No Text!", text_color=COLOR_ERROR)
-             return
 
-        text = text.rstrip()
+            text = text.rstrip()
         wpm = int(self.slider_speed.get())
         errors = self.slider_var.get()
         delay = 5
         suppress_indent = self.chk_indent.get()
 
+        seed_text = self.entry_seed.get().strip()
+        if seed_text and not seed_text.lstrip("-").isdigit():
+            self.lbl_status_val.configure(text="Bad Seed!", text_color=COLOR_ERROR)
+            return
+        seed = int(seed_text) if seed_text else None
+        resume_from = resume_stray = 0
+
+        if resume:
+            # Same text + same seed replays the same plan, so skip what was already typed
+            from checkpoint import load_checkpoint, text_digest
+            state = load_checkpoint()
+            digest = source["digest"] if source else text_digest(text)
+            if not state or state["digest"] != digest:
+                self.lbl_status_val.configure(text="Nothing to Resume", text_color=COLOR_ERROR)
+                return
+            params = state["params"]
+            wpm, errors = params["wpm"], params["error_rate"]
+            suppress_indent, seed = params["suppress_indent"], params["seed"]
+            resume_from, resume_stray = state["offset"], state["stray"]
+
         # Update UI state
         self.stop_event.clear()
         self.btn_start.configure(state="disabled", text="RUNNING...", fg_color=COLOR_SECONDARY)
+        self.btn_resume.configure(state="disabled")
         self.btn_stop.configure(state="normal")
+        self.btn_open.configure(state="disabled")
         self.text_area.configure(state="disabled")
         self.lbl_status_val.configure(text="Initializing...", text_color=COLOR_PRIMARY)
         self.bar_status.configure(progress_color=COLOR_SECONDARY)
 
-        self.typing_thread = threading.Thread(target=self.run_typing, args=(text, wpm, errors, delay, suppress_indent), daemon=True)
+        self.typing_thread = threading.Thread(target=self.run_typing, args=(text, wpm, errors, delay, suppress_indent, seed, resume_from, resume_stray, source), daemon=True)
         self.typing_thread.start()
 
     def ui(self, fn):
         """Schedule a UI update on the main thread (required on macOS)."""
         self.after(0, fn)
 
+    def poll_progress(self):
+        """Redraw the live stats from the engine's progress, then re-arm while a session runs."""
+        progress = self.progress
+        if progress is None:
+            return
+        stats = progress.sample()
+        total = f"/{progress.total}" if progress.total else ""
+        self.stat_labels["typed"].configure(text=f"{stats['typed']}{total}")
+        self.stat_labels["typos"].configure(text=str(stats["typos"]))
+        self.stat_labels["wpm"].configure(text=f"{stats['wpm']:.0f}")
+        self.stat_labels["eta"].configure(text=human_typer.format_seconds(stats["eta"]) if stats["eta"] is not None else "-")
+        if stats["done"] is not None:
+            self.bar_status.set(stats["done"])
+        self.poll_job = self.after(FRAME_MS, self.poll_progress)
+
+    def start_progress(self, progress):
+        """Main thread: show a new session's progress and start sampling it."""
+        for label in self.stat_labels.values():
+            label.configure(text="-")
+        self.progress = progress
+        self.poll_progress()
+
+    def stop_progress(self):
+        """Main thread: draw the final numbers and stop sampling."""
+        if self.progress is None:
+            return
+        self.after_cancel(self.poll_job)
+        self.poll_progress()
+        self.after_cancel(self.poll_job)
+        self.progress = None
+
     def stop_typing(self):
         if self.typing_thread and self.typing_thread.is_alive():
             self.ui(lambda: self.lbl_status_val.configure(text="Stopping...", text_color=COLOR_ERROR))
             self.stop_event.set()
 
-    def run_typing(self, text, wpm, errors, delay, suppress_indent):
-        # Countdown - all UI updates go through self.ui() for macOS thread safety
-        for i in range(delay, 0, -1):
-            if self.stop_event.is_set(): break
-            _i = i  # capture loop var
-            self.ui(lambda i=_i: (
-                self.lbl_status_val.configure(text=f"Click Window: {i}s", text_color=COLOR_SECONDARY),
-                self.bar_status.set(1.0 - (i/delay))
-            ))
-            time.sleep(1)
-        
-        if not self.stop_event.is_set():
-            self.ui(lambda: (
-                self.lbl_status_val.configure(text="Injecting...", text_color=COLOR_PRIMARY),
-                self.bar_status.configure(progress_color=COLOR_PRIMARY),
-                self.bar_status.set(0)
-            ))
-            
-            # Run the typing engine
-            human_typer.type_text(text, wpm=wpm, error_rate=errors, start_delay=0, stop_event=self.stop_event, suppress_indent=suppress_indent)
-        
-        # Cleanup - no hotkey to remove (using in-app STOP button)
+    def run_typing(self, *args):
+        """Worker thread: run a session, then always hand the window back, whatever went wrong."""
+        error = None
+        try:
+            self.type_session(*args)
+        except Exception as e:  # Backend unavailable (no pyautogui / display), file gone, planning failed...
+            print(f"Typing failed: {type(e).__name__}: {e}")
+            error = str(e) or type(e).__name__
 
         # Reset UI on the main thread
         is_stopped = self.stop_event.is_set()
-        self.ui(lambda stopped=is_stopped: (
-            self.lbl_status_val.configure(
-                text="Aborted" if stopped else "Completed",
-                text_color=COLOR_ERROR if stopped else COLOR_PRIMARY
-            ),
+        if error:
+            status, color = f"Error: {error}"[:STATUS_CHARS], COLOR_ERROR
+        elif is_stopped:
+            status, color = "Aborted", COLOR_ERROR
+        else:
+            status, color = "Completed", COLOR_PRIMARY
+        self.ui(lambda: (
+            self.lbl_status_val.configure(text=status, text_color=color),
             self.btn_start.configure(state="normal", text="START SESSION", fg_color=COLOR_PRIMARY),
+            self.btn_resume.configure(state="normal"),
             self.btn_stop.configure(state="disabled"),
-            self.text_area.configure(state="normal"),
+            self.btn_open.configure(state="normal"),
+            self.text_area.configure(state="disabled" if self.source_file else "normal"),
+            self.stop_progress(),
             self.bar_status.set(0),
             self.bar_status.configure(progress_color=COLOR_PRIMARY)
         ))
 
+    def type_session(self, text, wpm, errors, delay, suppress_indent, seed=None, resume_from=0, resume_stray=0,
+                     source=None):
+        import random
+        from checkpoint import Checkpoint, text_digest
+        from plan_cache import PlanCache
+        from typing_metrics import LiveProgress
+
+        # Plan before the countdown so typing starts the moment it ends;
+        # seeded repeat jobs come straight from the on-disk plan cache.
+        # Unseeded runs get a fresh seed so the checkpoint can rebuild them, but stay uncached.
+        # Files are streamed instead: planned alongside typing, never held in memory as a whole.
+        plan = None
+        if seed is None:
+            seed = random.randrange(2**32)
+        elif not source:
+            try:
+                plan, _ = PlanCache().get_or_plan(text, wpm=wpm, error_rate=errors, suppress_indent=suppress_indent, seed=seed)
+            except OSError:
+                pass
+        if source:
+            plan = human_typer.read_file_chunks(source["path"])
+            digest = source["digest"]
+        else:
+            if plan is None:
+                plan = human_typer.plan_keystrokes(text, wpm=wpm, error_rate=errors, suppress_indent=suppress_indent, seed=seed)
+            digest = text_digest(text)
+
+        params = {"wpm": wpm, "error_rate": errors, "suppress_indent": bool(suppress_indent),
+                  "vectorized": False, "seed": seed}
+        try:
+            checkpoint = Checkpoint(digest, params, offset=resume_from, stray=resume_stray)
+        except OSError:
+            checkpoint = None
+        try:
+            # Countdown - all UI updates go through self.ui() for macOS thread safety
+            for i in range(delay, 0, -1):
+                if self.stop_event.is_set(): break
+                _i = i  # capture loop var
+                self.ui(lambda i=_i: (
+                    self.lbl_status_val.configure(text=f"Click Window: {i}s", text_color=COLOR_SECONDARY),
+                    self.bar_status.set(1.0 - (i/delay))
+                ))
+                # Wakes immediately when STOP is pressed
+                if human_typer.sleep_or_stop(1, self.stop_event): break
+
+            progress = None
+            if not self.stop_event.is_set():
+                # A streamed file has no plan up front, so its size gives the total (ETA from the pace so far)
+                total = source["chars_no_indent" if suppress_indent else "chars"] - resume_from if source else None
+                progress = LiveProgress(total=total)
+                self.ui(lambda: (
+                    self.lbl_status_val.configure(text="Injecting...", text_color=COLOR_PRIMARY),
+                    self.bar_status.configure(progress_color=COLOR_PRIMARY),
+                    self.bar_status.set(0),
+                    self.start_progress(progress)
+                ))
+
+                # Run the typing engine; it only writes to progress, the UI samples it every FRAME_MS
+                human_typer.type_text(plan, wpm=wpm, error_rate=errors, start_delay=0, stop_event=self.stop_event,
+                                      suppress_indent=suppress_indent, seed=seed, checkpoint=checkpoint,
+                                      resume_from=resume_from, resume_stray=resume_stray, progress=progress,
+                                      special_chars=source["special_chars"] if source else None)
+        finally:
+            if checkpoint:
+                checkpoint.close()  # No-op when type_text() already closed it
+
 if __name__ == "__main__":
-    import os
     if IS_MACOS:
         # Suppress the deprecated Tk warning on macOS
         os.environ["TK_SILENCE_DEPRECATION"] = "1"
     app = HumanTyperApp()
+    # Load the hotkey library once the window is up, off the startup path
+    app.after(1000, get_hotkey_module)
     app.mainloop()
@@ -0,0 +1,647 @@
+"""
+Keystroke backends for Human Typer.
+
+The typing engine only talks to a backend through key_down / key_up /
+write / backspace, so the way keys reach the OS can be swapped:
+
+  pyautogui   Default, cross-platform (Windows, macOS, Linux). Characters
+              outside ASCII go through the platform's Unicode input
+              (SendInput / Quartz / XTest), since pyautogui drops them.
+  xtest       Linux/X11 only. Talks to the XTest extension directly via
+              ctypes and caches keycode lookups, skipping pyautogui's
+              per-call overhead. Works against any X server, incl. Xvfb.
+              Characters missing from the layout are typed by binding
+              them to spare keycodes.
+  null        Discards every key. For dry runs and benchmarks.
+  record      Keeps every key with a timestamp. For headless runs and tests.
+"""
+
+import os
+import sys
+import time
+
+# Named keys every backend understands, besides single characters
+SPECIAL_KEYS = ('enter', 'tab', 'backspace', 'shift', 'ctrl', 'command',
+                'left', 'right', 'up', 'down', 'home', 'end')
+
+
+class KeystrokeBackend:
+    """Base class for keystroke backends."""
+
+    name = None
+
+    def key_down(self, key):
+        raise NotImplementedError
+
+    def key_up(self, key):
+        raise NotImplementedError
+
+    def press(self, key):
+        """Press and release a single key."""
+        self.key_down(key)
+        self.key_up(key)
+
+    def write(self, text):
+        """Type text character by character ('\\n' is Enter, '\\t' is Tab)."""
+        for char in text:
+            if char == '\n':
+                self.press('enter')
+            elif char == '\t':
+                self.press('tab')
+            else:
+                self.press(char)
+
+    def backspace(self, count=1):
+        for _ in range(count):
+            self.press('backspace')
+
+    def hotkey(self, *keys):
+        """Hold the leading modifier keys while pressing the last key."""
+        for key in keys[:-1]:
+            self.key_down(key)
+        self.press(keys[-1])
+        for key in reversed(keys[:-1]):
+            self.key_up(key)
+
+    def prepare(self, chars):
+        """Get ready to type chars (e.g. map keys for characters the layout lacks) before the run starts."""
+
+    def close(self):
+        """Release any OS resources held by the backend."""
+
+
+# ──────────────────────────────────────────────────────
+# pyautogui (default)
+# ──────────────────────────────────────────────────────
+
+class PyAutoGUIBackend(KeystrokeBackend):
+    """Sends keys through pyautogui."""
+
+    name = 'pyautogui'
+
+    def __init__(self):
+        try:
+            import pyautogui
+        except ImportError:
+            raise ImportError("pyautogui is required but not installed. Install it with:  pip install pyautogui")
+        # Disable pyautogui's failsafe pause for smoother typing
+        pyautogui.PAUSE = 0
+        self._pyautogui = pyautogui
+        self._unicode = None  # Unicode input for non-ASCII characters, opened on first use
+
+    def key_down(self, key):
+        self._pyautogui.keyDown(key)
+
+    def key_up(self, key):
+        self._pyautogui.keyUp(key)
+
+    def press(self, key):
+        if len(key) == 1 and not key.isascii():
+            self._type_unicode(key)
+        else:
+            self._pyautogui.press(key)
+
+    def _type_unicode(self, char):
+        if self._unicode is None:
+            self._unicode = open_unicode_input()
+        self._unicode.press(char)
+
+    def prepare(self, chars):
+        if chars:
+            if self._unicode is None:
+                self._unicode = open_unicode_input()
+            self._unicode.prepare(chars)
+
+    def write(self, text):
+        # Printable ASCII runs go through one typewrite call (it handles shift itself)
+        run = []
+        for char in text:
+            if char.isascii() and char.isprintable():
+                run.append(char)
+                continue
+            if run:
+                self._pyautogui.typewrite(''.join(run), interval=0)
+                run = []
+            if char == '\n':
+                self._pyautogui.press('enter')
+            elif char == '\t':
+                self._pyautogui.press('tab')
+            elif not char.isascii():
+                self._type_unicode(char)
+            else:
+                self._pyautogui.press(char)
+        if run:
+            self._pyautogui.typewrite(''.join(run), interval=0)
+
+    def backspace(self, count=1):
+        self._pyautogui.press('backspace', presses=count)
+
+    def hotkey(self, *keys):
+        self._pyautogui.hotkey(*keys)
+
+    def close(self):
+        if self._unicode is not None:
+            self._unicode.close()
+            self._unicode = None
+
+
+# ──────────────────────────────────────────────────────
+# Unicode input (characters without a key on the layout)
+# ──────────────────────────────────────────────────────
+
+class _WindowsUnicodeInput:
+    """SendInput with KEYEVENTF_UNICODE: any character, no keyboard layout involved."""
+
+    KEYEVENTF_KEYUP = 0x0002
+    KEYEVENTF_UNICODE = 0x0004
+    INPUT_KEYBOARD = 1
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class KEYBDINPUT(ctypes.Structure):
+            _fields_ = [('wVk', wintypes.WORD), ('wScan', wintypes.WORD), ('dwFlags', wintypes.DWORD),
+                        ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG), ('mouseData', wintypes.DWORD),
+                        ('dwFlags', wintypes.DWORD), ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+        class _INPUT_UNION(ctypes.Union):
+            _fields_ = [('ki', KEYBDINPUT), ('mi', MOUSEINPUT)]  # mi only sizes the union like the C one
+
+        class INPUT(ctypes.Structure):
+            _fields_ = [('type', wintypes.DWORD), ('u', _INPUT_UNION)]
+
+        self._ctypes = ctypes
+        self._INPUT = INPUT
+        self._send = ctypes.windll.user32.SendInput
+
+    def press(self, char):
+        # One down/up pair per UTF-16 code unit (astral characters are surrogate pairs)
+        data = char.encode('utf-16-le')
+        units = [int.from_bytes(data[i:i + 2], 'little') for i in range(0, len(data), 2)]
+        inputs = (self._INPUT * (2 * len(units)))()
+        for i, unit in enumerate(units):
+            for j, flags in enumerate((self.KEYEVENTF_UNICODE, self.KEYEVENTF_UNICODE | self.KEYEVENTF_KEYUP)):
+                event = inputs[2 * i + j]
+                event.type = self.INPUT_KEYBOARD
+                event.u.ki.wScan = unit
+                event.u.ki.dwFlags = flags
+        self._send(len(inputs), inputs, self._ctypes.sizeof(self._INPUT))
+
+    def prepare(self, chars):
+        pass
+
+    def close(self):
+        pass
+
+
+class _MacUnicodeInput:
+    """Quartz keyboard events carrying the character as their Unicode string."""
+
+    def __init__(self):
+        import Quartz  # pyobjc, installed with pyautogui on macOS
+        self._quartz = Quartz
+
+    def press(self, char):
+        quartz = self._quartz
+        length = len(char.encode('utf-16-le')) // 2
+        for is_down in (True, False):
+            event = quartz.CGEventCreateKeyboardEvent(None, 0, is_down)
+            quartz.CGEventKeyboardSetUnicodeString(event, length, char)
+            quartz.CGEventPost(quartz.kCGHIDEventTap, event)
+
+    def prepare(self, chars):
+        pass
+
+    def close(self):
+        pass
+
+
+class _MissingUnicodeInput:
+    """No Unicode input available: warn once, then skip such characters."""
+
+    def __init__(self, reason):
+        self.reason = reason
+        self._warned = False
+
+    def press(self, char):
+        if not self._warned:
+            self._warned = True
+            print(f"WARNING: cannot type non-ASCII characters ({self.reason}); they will be skipped.")
+
+    def prepare(self, chars):
+        pass
+
+    def close(self):
+        pass
+
+
+def open_unicode_input():
+    """Best way to type arbitrary characters on this platform: an object with press(char), prepare(chars), close()."""
+    try:
+        if sys.platform == 'win32':
+            return _WindowsUnicodeInput()
+        if sys.platform == 'darwin':
+            return _MacUnicodeInput()
+        return XTestBackend()  # X11: binds missing characters to spare keycodes
+    except (ImportError, OSError) as e:
+        return _MissingUnicodeInput(e)
+
+
+# ──────────────────────────────────────────────────────
+# XTest via ctypes (Linux / X11)
+# ──────────────────────────────────────────────────────
+
+XK_BACKSPACE = 0xff08
+XK_TAB = 0xff09
+XK_RETURN = 0xff0d
+XK_HOME = 0xff50
+XK_LEFT = 0xff51
+XK_UP = 0xff52
+XK_RIGHT = 0xff53
+XK_DOWN = 0xff54
+XK_END = 0xff57
+XK_SHIFT_L = 0xffe1
+XK_CONTROL_L = 0xffe3
+XK_SUPER_L = 0xffeb
+
+_NAMED_KEYSYMS = {
+    'enter': XK_RETURN,
+    'tab': XK_TAB,
+    'backspace': XK_BACKSPACE,
+    'shift': XK_SHIFT_L,
+    'ctrl': XK_CONTROL_L,
+    'command': XK_SUPER_L,
+    'left': XK_LEFT,
+    'right': XK_RIGHT,
+    'up': XK_UP,
+    'down': XK_DOWN,
+    'home': XK_HOME,
+    'end': XK_END,
+}
+
+
+def char_to_keysym(char):
+    """Map a character to its X11 keysym."""
+    code = ord(char)
+    if char == '\n':
+        return XK_RETURN
+    if char == '\t':
+        return XK_TAB
+    # Latin-1 keysyms are identical to their code points
+    if 0x20 <= code <= 0x7e or 0xa0 <= code <= 0xff:
+        return code
+    # Everything else uses the Unicode keysym range
+    return 0x01000000 | code
+
+
+def _load_x_library(name):
+    import ctypes
+    import ctypes.util
+
+    path = ctypes.util.find_library(name)
+    if not path:
+        raise OSError(f"lib{name} not found. Install it with:  sudo apt install lib{name.lower()}-dev")
+    return ctypes.cdll.LoadLibrary(path)
+
+
+# Time the target gets to read a key typed through a spare-keycode binding before
+# that keycode is bound to another character (or unbound by close())
+REMAP_SETTLE = 0.05
+
+
+class XTestBackend(KeystrokeBackend):
+    """
+    Injects keys with XTestFakeKeyEvent on the display in $DISPLAY (or display_name).
+    Keycode and shift-level lookups are cached per character.
+    Characters the layout lacks (accents behind AltGr, other scripts, emoji)
+    are bound to keycodes that have no keysym; bindings are reused least
+    recently used first, so a multilingual text remaps rarely, and are
+    removed again on close().
+    """
+
+    name = 'xtest'
+
+    def __init__(self, display_name=None):
+        # Imported here so other backends (and planning-only runs) don't pay for ctypes
+        import ctypes
+
+        self._display = None
+        self._spare = None   # Keycodes without keysyms, found on first need
+        self._bound = {}     # char -> spare keycode it is bound to, least recently used first
+        self._pressed = {}   # spare keycode -> perf_counter() of its last press
+
+        self._xlib = _load_x_library('X11')
+        self._xtst = _load_x_library('Xtst')
+
+        self._xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self._xlib.XOpenDisplay.restype = ctypes.c_void_p
+        self._xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self._xlib.XFlush.argtypes = [ctypes.c_void_p]
+        self._xlib.XKeysymToKeycode.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+        self._xlib.XKeysymToKeycode.restype = ctypes.c_ubyte
+        self._xlib.XkbKeycodeToKeysym.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_int]
+        self._xlib.XkbKeycodeToKeysym.restype = ctypes.c_ulong
+        self._xtst.XTestQueryExtension.argtypes = [ctypes.c_void_p] + [ctypes.POINTER(ctypes.c_int)] * 4
+        self._xtst.XTestFakeKeyEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong]
+        self._xlib.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self._xlib.XDisplayKeycodes.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int),
+                                                ctypes.POINTER(ctypes.c_int)]
+        self._xlib.XGetKeyboardMapping.argtypes = [ctypes.c_void_p, ctypes.c_ubyte, ctypes.c_int,
+                                                   ctypes.POINTER(ctypes.c_int)]
+        self._xlib.XGetKeyboardMapping.restype = ctypes.POINTER(ctypes.c_ulong)
+        self._xlib.XChangeKeyboardMapping.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int,
+                                                      ctypes.POINTER(ctypes.c_ulong), ctypes.c_int]
+        self._xlib.XFree.argtypes = [ctypes.c_void_p]
+        self._ctypes = ctypes
+
+        display_name = display_name or os.environ.get('DISPLAY')
+        self._display = self._xlib.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self._display:
+            raise OSError(f"Cannot open X display {display_name!r}")
+
+        dummy = [ctypes.c_int() for _ in range(4)]
+        if not self._xtst.XTestQueryExtension(self._display, *[ctypes.byref(d) for d in dummy]):
+            self.close()
+            raise OSError("X server does not support the XTest extension")
+
+        self._cache = {}  # key -> (keycode, needs_shift), keycode 0 if unmapped
+        self._shift = self._lookup('shift')[0]
+
+    def _lookup(self, key):
+        """Resolve a key (char or SPECIAL_KEYS name) to (keycode, needs_shift)."""
+        hit = self._cache.get(key)
+        if hit is not None:
+            return hit
+
+        keysym = _NAMED_KEYSYMS[key] if len(key) > 1 else char_to_keysym(key)
+        keycode = self._xlib.XKeysymToKeycode(self._display, keysym)
+        needs_shift = False
+        if keycode:
+            if self._xlib.XkbKeycodeToKeysym(self._display, keycode, 0, 0) != keysym:
+                # Level 1 is the shifted level; deeper levels (AltGr) aren't reachable here
+                if self._xlib.XkbKeycodeToKeysym(self._display, keycode, 0, 1) == keysym:
+                    needs_shift = True
+                else:
+                    keycode = 0
+
+        self._cache[key] = (keycode, needs_shift)
+        return keycode, needs_shift
+
+    def _find_spare_keycodes(self):
+        ctypes = self._ctypes
+        low, high = ctypes.c_int(), ctypes.c_int()
+        self._xlib.XDisplayKeycodes(self._display, ctypes.byref(low), ctypes.byref(high))
+        per = ctypes.c_int()
+        count = high.value - low.value + 1
+        syms = self._xlib.XGetKeyboardMapping(self._display, low.value, count, ctypes.byref(per))
+        if not syms:
+            return []
+        try:
+            return [low.value + i for i in range(count)
+                    if not any(syms[i * per.value + j] for j in range(per.value))]
+        finally:
+            self._xlib.XFree(syms)
+
+    def _bind(self, char):
+        """Keycode typing char through a spare-keycode binding, or 0 if there are no spare keycodes."""
+        keycode = self._bound.pop(char, None)
+        if keycode is not None:
+            self._bound[char] = keycode  # Now most recently used
+            return keycode
+
+        if self._spare is None:
+            self._spare = self._find_spare_keycodes()
+        if len(self._bound) < len(self._spare):
+            keycode = self._spare[len(self._bound)]
+        elif self._bound:
+            keycode = self._bound.pop(next(iter(self._bound)))
+            self._settle(keycode)
+        else:
+            return 0
+
+        keysym = char_to_keysym(char)
+        # Same keysym on both levels, so the binding types char whatever the shift state
+        syms = (self._ctypes.c_ulong * 2)(keysym, keysym)
+        self._xlib.XChangeKeyboardMapping(self._display, keycode, 2, syms, 1)
+        self._xlib.XSync(self._display, False)
+        self._bound[char] = keycode
+        return keycode
+
+    def prepare(self, chars):
+        # Bind up front what fits in the spare keycodes, so typing rarely has to remap
+        for char in chars:
+            if len(char) == 1 and not self._lookup(char)[0]:
+                if self._spare is not None and len(self._bound) >= len(self._spare):
+                    break
+                self._bind(char)
+
+    def _settle(self, *keycodes):
+        """
+        Wait until REMAP_SETTLE has passed since the last press of keycodes, so the
+        target has read those presses with the old binding before it changes.
+        """
+        wait = max(self._pressed.get(keycode, 0.0) for keycode in keycodes) + REMAP_SETTLE - time.perf_counter()
+        if wait > 0:
+            self._xlib.XSync(self._display, False)
+            time.sleep(wait)
+
+    def _unbind_all(self):
+        if not self._bound:
+            return
+        self._settle(*self._bound.values())
+        no_symbol = (self._ctypes.c_ulong * 1)(0)
+        for keycode in self._bound.values():
+            self._xlib.XChangeKeyboardMapping(self._display, keycode, 1, no_symbol, 1)
+        self._xlib.XSync(self._display, False)
+        self._bound = {}
+        self._pressed = {}
+
+    def _fake(self, keycode, is_press):
+        self._xtst.XTestFakeKeyEvent(self._display, keycode, is_press, 0)
+
+    def key_down(self, key):
+        keycode, _ = self._lookup(key)
+        if keycode:
+            self._fake(keycode, True)
+            self._xlib.XFlush(self._display)
+
+    def key_up(self, key):
+        keycode, _ = self._lookup(key)
+        if keycode:
+            self._fake(keycode, False)
+            self._xlib.XFlush(self._display)
+
+    def press(self, key):
+        keycode, needs_shift = self._lookup(key)
+        bound = not keycode
+        if bound:
+            if len(key) > 1:
+                return
+            keycode = self._bind(key)  # Not on the current keyboard layout
+            if not keycode:
+                return
+        if needs_shift:
+            self._fake(self._shift, True)
+        self._fake(keycode, True)
+        self._fake(keycode, False)
+        if needs_shift:
+            self._fake(self._shift, False)
+        self._xlib.XFlush(self._display)
+        if bound:
+            self._pressed[keycode] = time.perf_counter()
+
+    def close(self):
+        if self._display:
+            self._unbind_all()
+            self._xlib.XCloseDisplay(self._display)
+            self._display = None
+
+
+# ──────────────────────────────────────────────────────
+# Headless backends
+# ──────────────────────────────────────────────────────
+
+class NullBackend(KeystrokeBackend):
+    """Accepts and discards every key."""
+
+    name = 'null'
+
+    def key_down(self, key):
+        pass
+
+    def key_up(self, key):
+        pass
+
+    def press(self, key):
+        pass
+
+    def write(self, text):
+        pass
+
+    def backspace(self, count=1):
+        pass
+
+    def hotkey(self, *keys):
+        pass
+
+
+class RecordingBackend(KeystrokeBackend):
+    """
+    Records every key as (timestamp, action, key), action being 'down', 'up' or 'press'.
+    clock: Callable returning the current time; pass a virtual clock's now() to
+    record sessions that never really sleep.
+    """
+
+    name = 'record'
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.events = []
+
+    def key_down(self, key):
+        self.events.append((self.clock(), 'down', key))
+
+    def key_up(self, key):
+        self.events.append((self.clock(), 'up', key))
+
+    def press(self, key):
+        self.events.append((self.clock(), 'press', key))
+
+    def write(self, text):
+        now = self.clock()
+        for char in text:
+            self.events.append((now, 'press', char))
+
+    def backspace(self, count=1):
+        now = self.clock()
+        for _ in range(count):
+            self.events.append((now, 'press', 'backspace'))
+
+    def output(self):
+        """
+        Text the recorded presses would leave in a plain text field (no soft wrap),
+        following cursor keys: Home/End or Command+Left/Right for the line,
+        Ctrl+Home or Command+Up for the start of the text.
+        """
+        out = []
+        cursor = 0
+        held = set()
+        for _, action, key in self.events:
+            if action == 'down':
+                held.add(key)
+                continue
+            if action == 'up':
+                held.discard(key)
+                continue
+
+            line_start = cursor - 1
+            while line_start >= 0 and out[line_start] != '\n':
+                line_start -= 1
+            line_start += 1
+
+            if key == 'backspace':
+                if cursor:
+                    cursor -= 1
+                    del out[cursor]
+            elif (key == 'home' and 'ctrl' in held) or (key == 'up' and 'command' in held):
+                cursor = 0
+            elif key == 'home' or (key == 'left' and 'command' in held):
+                cursor = line_start
+            elif key == 'end' or (key == 'right' and 'command' in held):
+                while cursor < len(out) and out[cursor] != '\n':
+                    cursor += 1
+            elif key == 'left':
+                cursor = max(0, cursor - 1)
+            elif key == 'right':
+                cursor = min(len(out), cursor + 1)
+            elif key in ('up', 'down'):
+                col = cursor - line_start
+                if key == 'up':
+                    if not line_start:
+                        continue
+                    start = line_start - 1
+                    while start > 0 and out[start - 1] != '\n':
+                        start -= 1
+                    cursor = min(start + col, line_start - 1)
+                else:
+                    end = cursor
+                    while end < len(out) and out[end] != '\n':
+                        end += 1
+                    if end == len(out):
+                        continue
+                    stop = end + 1
+                    while stop < len(out) and out[stop] != '\n':
+                        stop += 1
+                    cursor = min(end + 1 + col, stop)
+            else:
+                out.insert(cursor, {'enter': '\n', 'tab': '\t'}.get(key, key))
+                cursor += 1
+        return ''.join(out)
+
+
+# ──────────────────────────────────────────────────────
+# Registry
+# ──────────────────────────────────────────────────────
+
+BACKENDS = {
+    PyAutoGUIBackend.name: PyAutoGUIBackend,
+    XTestBackend.name: XTestBackend,
+    NullBackend.name: NullBackend,
+    RecordingBackend.name: RecordingBackend,
+}
+
+DEFAULT_BACKEND = PyAutoGUIBackend.name
+
+
+def get_backend(backend=None):
+    """Return a backend instance from a name, an instance, or None for the default."""
+    if isinstance(backend, KeystrokeBackend):
+        return backend
+    name = backend or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name!r}. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
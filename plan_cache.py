@@ -0,0 +1,117 @@
+"""
+Content-addressed on-disk cache of keystroke plans.
+
+Plans are keyed by a SHA-256 of the text plus every parameter that shapes
+the plan (wpm, error rate, anti-indent, seed, planner, timing model) and are stored in
+the binary session format, so a hit is memory-mapped instead of parsed.
+The cache directory is kept under a size limit with LRU eviction
+(file mtime is bumped on every hit).
+
+Seed policy: only seeded plans are cached. An unseeded run is meant to
+be different every time, so reusing its plan would freeze its typos.
+"""
+
+import hashlib
+import json
+import os
+
+from human_typer import KeystrokePlan, iter_chunks, plan_keystrokes
+
+# Bump when the planner changes in a way that makes old plans stale
+PLAN_CACHE_VERSION = 5
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+PLAN_SUFFIX = '.hts'
+
+
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'human_typer', 'plans')
+
+
+class PlanCache:
+    """Size-bounded LRU cache of KeystrokePlans on disk."""
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(text, wpm, error_rate, suppress_indent, seed, vectorized=False, timing=None):
+        """Cache key for text (str or iterable of chunks) and planning parameters."""
+        digest = hashlib.sha256()
+        params = {'v': PLAN_CACHE_VERSION, 'wpm': wpm, 'error_rate': error_rate,
+                  'suppress_indent': bool(suppress_indent), 'seed': seed, 'vectorized': bool(vectorized)}
+        if timing:
+            params['timing'] = timing.digest
+        digest.update(json.dumps(params, sort_keys=True).encode('utf-8'))
+        for chunk in iter_chunks(text):
+            digest.update(chunk.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + PLAN_SUFFIX)
+
+    def get(self, key):
+        """Memory-mapped plan for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            plan = KeystrokePlan.load(path, use_mmap=True)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        return plan
+
+    def put(self, key, plan):
+        """Store plan (atomically, see KeystrokePlan.save()), then evict least recently used plans."""
+        plan.save(self._path(key))
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(PLAN_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass  # Still mapped by a running session (Windows); try again next time
+
+    def get_or_plan(self, text, wpm=60, error_rate=0.06, suppress_indent=False, seed=None, vectorized=False,
+                    reopen=None, timing=None, jobs=1):
+        """
+        Return (plan, hit). Unseeded requests are planned fresh and never cached.
+        reopen: For one-shot streams, a callable returning a fresh stream of the
+        same text; the first pass is used for the digest, the second for planning.
+        jobs: Processes for planning a miss (see plan_keystrokes()).
+        """
+        if seed is None:
+            return plan_keystrokes(text, wpm, error_rate, suppress_indent, seed, vectorized, timing, jobs), False
+
+        key = self.key(text, wpm, error_rate, suppress_indent, seed, vectorized, timing)
+        plan = self.get(key)
+        if plan is not None:
+            return plan, True
+
+        if reopen:
+            text = reopen()
+        plan = plan_keystrokes(text, wpm, error_rate, suppress_indent, seed, vectorized, timing, jobs)
+        self.put(key, plan)
+        return plan, False
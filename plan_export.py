@@ -0,0 +1,104 @@
+"""
+Export a planned session as a script that native tools can run without Python.
+
+  xdotool   A /bin/sh script feeding one `xdotool -` process a command per key
+            (key ...) and per pause (sleep ...). xdotool sleeps in between, so an
+            hour-long session costs next to no CPU, and the script runs on any X11
+            host with xdotool installed. Characters outside the keyboard layout are
+            sent as Unicode keysyms, which xdotool binds to a spare keycode itself.
+
+Typos, corrections and pauses are whatever the plan holds, so the exported
+session is the one type_text() would have typed with the same seed.
+
+Local test:
+  Xvfb :9 & DISPLAY=:9 xterm &
+  python3 human_typer.py -f essay.txt --seed 7 --export xdotool -o session.sh
+  DISPLAY=:9 sh session.sh
+"""
+
+from human_typer import (ACTION_BACKSPACE, ACTION_NAV, CURSOR_DOC_START, CURSOR_DOWN, CURSOR_LEFT, CURSOR_LINE_END,
+                         CURSOR_LINE_START, CURSOR_RIGHT, CURSOR_UP, KeystrokePlan, format_seconds)
+
+# X11 keysym names of printable ASCII characters that aren't letters or digits
+_ASCII_KEYSYMS = {
+    ' ': 'space', '!': 'exclam', '"': 'quotedbl', '#': 'numbersign', '$': 'dollar', '%': 'percent',
+    '&': 'ampersand', "'": 'apostrophe', '(': 'parenleft', ')': 'parenright', '*': 'asterisk', '+': 'plus',
+    ',': 'comma', '-': 'minus', '.': 'period', '/': 'slash', ':': 'colon', ';': 'semicolon', '<': 'less',
+    '=': 'equal', '>': 'greater', '?': 'question', '@': 'at', '[': 'bracketleft', '\\': 'backslash',
+    ']': 'bracketright', '^': 'asciicircum', '_': 'underscore', '`': 'grave', '{': 'braceleft', '|': 'bar',
+    '}': 'braceright', '~': 'asciitilde', '\n': 'Return', '\t': 'Tab',
+}
+
+# Cursor keys of incremental retype (X11 bindings, whatever platform exports the plan)
+_NAV_KEYSYMS = {
+    CURSOR_LEFT: 'Left',
+    CURSOR_RIGHT: 'Right',
+    CURSOR_UP: 'Up',
+    CURSOR_DOWN: 'Down',
+    CURSOR_LINE_START: 'Home',
+    CURSOR_LINE_END: 'End',
+    CURSOR_DOC_START: 'ctrl+Home',
+}
+
+# Pauses shorter than this are folded into the next one (xdotool sleeps in whole milliseconds here)
+_MIN_SLEEP = 0.001
+
+_HEREDOC_END = 'END_OF_HUMAN_TYPER_SESSION'
+
+
+def keysym_name(char):
+    """xdotool key name for one character."""
+    if char.isascii() and char.isalnum():
+        return char
+    name = _ASCII_KEYSYMS.get(char)
+    if name:
+        return name
+    return f'U{ord(char):04X}'
+
+
+def write_xdotool_script(events, out, start_delay=0, scale=1.0):
+    """
+    Write events (a KeystrokePlan or any (key, action, delay) iterable) to the
+    text stream out as an xdotool shell script, streaming: one line per key or pause.
+    start_delay: Seconds to wait before the first key (time to focus the target).
+    scale: Multiplier for every pause (e.g. to fit a target duration).
+    Returns the number of keys written.
+    """
+    out.write('#!/bin/sh\n')
+    if isinstance(events, KeystrokePlan):
+        meta = ' '.join(f'{k}={v}' for k, v in events.meta.items() if v is not None)
+        out.write(f'# Human Typer session: {len(events)} keys, {events.typed_chars} characters, '
+                  f'~{format_seconds(events.duration * scale)}\n')
+        if meta:
+            out.write(f'# {meta}\n')
+    out.write('# Focus the target window, then run this script (needs xdotool and $DISPLAY).\n')
+    out.write(f"exec xdotool - <<'{_HEREDOC_END}'\n")
+    if start_delay > 0:
+        out.write(f'sleep {start_delay}\n')
+
+    keys = 0
+    pending = 0.0  # Pause not written yet, incl. what rounding to milliseconds left over
+    for key, action, delay in events:
+        if pending >= _MIN_SLEEP:
+            ms = round(pending * 1000)
+            out.write(f'sleep {ms / 1000:.3f}\n')
+            pending -= ms / 1000
+
+        if action == ACTION_BACKSPACE:
+            name = 'BackSpace'
+        elif action == ACTION_NAV:
+            name = _NAV_KEYSYMS[key]
+        else:
+            # Burst-coalesced events can carry several characters
+            name = ' '.join(keysym_name(char) for char in key)
+        out.write(f'key --delay 0 {name}\n')
+        keys += 1
+        pending += delay * scale
+
+    out.write(f'{_HEREDOC_END}\n')
+    return keys
+
+
+EXPORT_FORMATS = {
+    'xdotool': write_xdotool_script,
+}
@@ -0,0 +1,226 @@
+"""
+Incremental retype: bring an already-typed field up to date with an edited
+text by typing only what changed.
+
+diff_hunks() computes a minimal edit script between what the field holds
+and the new text with Myers' O(ND) diff (after trimming the common prefix
+and suffix, so cost follows the size of the edits, not of the document).
+plan_retype() turns it into a KeystrokePlan: arrow keys to reach each
+changed region, backspaces for removed text and the engine's normal
+human-like typing (jitter, typos, corrections) for inserted text.
+
+The field is assumed to behave like a plain text editor without soft
+wrap: Up/Down move by text line, Home/End go to the start/end of a line.
+"""
+
+import random
+from bisect import bisect_left
+
+from human_typer import (ACTION_BACKSPACE, ACTION_NAV, BACKSPACE, CURSOR_DOC_START, CURSOR_DOWN, CURSOR_LEFT,
+                         CURSOR_LINE_END, CURSOR_LINE_START, CURSOR_RIGHT, CURSOR_UP, KeystrokePlan,
+                         iter_keystrokes, prepare_text)
+
+# Edit distance above which a character diff gives up and diffs lines instead
+MAX_EDIT_DISTANCE = 2000
+
+
+def _snake(a, b, x, y):
+    """Length of the common run of a[x:] and b[y:]; long runs are compared slice-wise in C."""
+    n = min(len(a) - x, len(b) - y)
+    i = 0
+    while i < n and i < 32 and a[x + i] == b[y + i]:
+        i += 1
+    if i < 32 or i == n:
+        return i
+
+    # Gallop, then binary search for the first mismatch
+    lo, step = i, 64
+    while True:
+        hi = min(n, lo + step)
+        if a[x + lo:x + hi] != b[y + lo:y + hi]:
+            break
+        lo = hi
+        if lo == n:
+            return n
+        step *= 2
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if a[x + lo:x + mid] == b[y + lo:y + mid]:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def _myers(a, b, max_d):
+    """
+    Shortest edit script from sequence a to b as hunks (a_start, a_end, b_start, b_end):
+    a[a_start:a_end] is replaced by b[b_start:b_end]. None if it needs more than max_d edits.
+    """
+    n, m = len(a), len(b)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace = []
+
+    for d in range(max_d + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]      # Insertion (move down)
+            else:
+                x = v[offset + k - 1] + 1  # Deletion (move right)
+            x += _snake(a, b, x, x - k)
+            v[offset + k] = x
+            if x >= n and x - k >= m:
+                trace.append(v[offset - d:offset + d + 1])
+                return _hunks(_backtrack(trace, n, m))
+        trace.append(v[offset - d:offset + d + 1])
+    return None
+
+
+def _backtrack(trace, n, m):
+    """Walk the saved frontiers back from (n, m); returns edits in forward order."""
+    edits = []  # (is_insert, x, y)
+    x, y = n, m
+    for d in range(len(trace) - 1, 0, -1):
+        prev = trace[d - 1]  # Diagonals -(d-1)..(d-1) at index k + d - 1
+        k = x - y
+        if k == -d or (k != d and prev[k - 1 + d - 1] < prev[k + 1 + d - 1]):
+            prev_k = k + 1
+            prev_x = prev[prev_k + d - 1]
+            edits.append((True, prev_x, prev_x - prev_k))
+        else:
+            prev_k = k - 1
+            prev_x = prev[prev_k + d - 1]
+            edits.append((False, prev_x, prev_x - prev_k))
+        x, y = prev_x, prev_x - prev_k
+    edits.reverse()
+    return edits
+
+
+def _hunks(edits):
+    """Merge single-element edits into contiguous replace hunks."""
+    hunks = []
+    for is_insert, x, y in edits:
+        if hunks and hunks[-1][1] == x and hunks[-1][3] == y:
+            a_start, a_end, b_start, b_end = hunks[-1]
+            hunks[-1] = (a_start, a_end if is_insert else x + 1, b_start, y + 1 if is_insert else b_end)
+        elif is_insert:
+            hunks.append((x, x, y, y + 1))
+        else:
+            hunks.append((x, x + 1, y, y))
+    return hunks
+
+
+def diff_hunks(old, new, max_edits=MAX_EDIT_DISTANCE):
+    """
+    Minimal edit script from str old to str new as hunks (old_start, old_end, new_start, new_end).
+    Edits beyond max_edits characters fall back to a line diff refined per changed block.
+    """
+    pre = _snake(old, new, 0, 0)
+    suf = min(_snake(old[::-1], new[::-1], 0, 0), min(len(old), len(new)) - pre)
+    a = old[pre:len(old) - suf]
+    b = new[pre:len(new) - suf]
+    if not a and not b:
+        return []
+
+    hunks = _myers(a, b, max_edits) if a and b else [(0, len(a), 0, len(b))]
+    if hunks is None:
+        hunks = []
+        la, lb = a.splitlines(True), b.splitlines(True)
+        line_hunks = _myers(la, lb, max_edits) or [(0, len(la), 0, len(lb))]
+        a_pos, b_pos = _offsets(la), _offsets(lb)
+        for a_start, a_end, b_start, b_end in line_hunks:
+            a_start, a_end, b_start, b_end = a_pos[a_start], a_pos[a_end], b_pos[b_start], b_pos[b_end]
+            refined = _myers(a[a_start:a_end], b[b_start:b_end], max_edits)
+            if refined is None:
+                hunks.append((a_start, a_end, b_start, b_end))
+            else:
+                hunks += [(a_start + s, a_start + e, b_start + bs, b_start + be) for s, e, bs, be in refined]
+
+    return [(pre + s, pre + e, pre + bs, pre + be) for s, e, bs, be in hunks]
+
+
+def _offsets(lines):
+    """Character offset of the start of every line, plus the total length."""
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+    return offsets
+
+
+class _Lines:
+    """Line lookup for the text currently in the field."""
+
+    def __init__(self, text):
+        self.length = len(text)
+        self.newlines = []
+        i = text.find('\n')
+        while i != -1:
+            self.newlines.append(i)
+            i = text.find('\n', i + 1)
+
+    def locate(self, pos):
+        """(row, column) of pos."""
+        row = bisect_left(self.newlines, pos)
+        return row, pos - (self.newlines[row - 1] + 1 if row else 0)
+
+    def line_end(self, row):
+        return self.newlines[row] if row < len(self.newlines) else self.length
+
+
+def _cursor_moves(lines, cursor, row, target, limit):
+    """
+    Cheapest key sequence from cursor (on line row) back to target.
+    Text from limit on may already be edited, so End is only used on lines ending before it.
+    """
+    t_row, t_col = lines.locate(target)
+    up = row - t_row
+    options = [
+        ((CURSOR_LEFT, cursor - target),),
+        ((CURSOR_LINE_START, 1), (CURSOR_UP, up), (CURSOR_RIGHT, t_col)),
+        ((CURSOR_DOC_START, 1), (CURSOR_DOWN, t_row), (CURSOR_RIGHT, t_col)),
+    ]
+    line_end = lines.line_end(t_row)
+    if up and line_end < limit:
+        options.append(((CURSOR_UP, up), (CURSOR_LINE_END, 1), (CURSOR_LEFT, line_end - target)))
+    best = min(options, key=lambda moves: sum(count for _, count in moves))
+    return [key for key, count in best for _ in range(count)]
+
+
+def plan_retype(typed, text, wpm=60, error_rate=0.06, seed=None, timing=None):
+    """
+    Plan the keystrokes that turn a field holding typed into one holding text,
+    starting with the cursor at the end of typed (where typing left it).
+    Changed regions are visited from last to first, so every cursor position
+    still refers to unedited text before it.
+    seed: Optional seed for a private RNG, making the plan reproducible.
+    timing: Optional timing_model.TimingModel for the rhythm of inserted text.
+    """
+    typed, text = prepare_text(typed), prepare_text(text)
+    rng = random.Random(seed)
+    lines = _Lines(typed)
+    plan = KeystrokePlan({'wpm': wpm, 'error_rate': error_rate, 'seed': seed, 'retype': True})
+
+    cursor = limit = len(typed)
+    row = len(lines.newlines)
+
+    for start, end, new_start, new_end in reversed(diff_hunks(typed, text)):
+        moves = _cursor_moves(lines, cursor, row, end, limit)
+        for key in moves:
+            plan.append(key, ACTION_NAV, rng.uniform(0.03, 0.08))
+        if moves:
+            # Reread the spot before changing it
+            plan.delays[-1] += rng.uniform(0.2, 0.6)
+
+        for _ in range(end - start):
+            plan.append(BACKSPACE, ACTION_BACKSPACE, rng.uniform(0.03, 0.08))
+
+        insert = text[new_start:new_end]
+        for key, action, delay in iter_keystrokes(insert, wpm, error_rate, seed=rng.getrandbits(64),
+                                                  timing=timing):
+            plan.append(key, action, delay)
+
+        cursor, limit = start + len(insert), start
+        row = lines.locate(start)[0] + insert.count('\n')
+
+    return plan
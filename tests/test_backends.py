@@ -0,0 +1,65 @@
+import sys
+
+import pytest
+
+import human_typer
+import keystroke_backends
+from keystroke_backends import XTestBackend
+
+
+class FakeFunction:
+    def __init__(self, name, lib):
+        self.name = name
+        self.lib = lib
+
+    def __call__(self, *args):
+        self.lib.calls.append(self.name)
+        return self.lib.returns.get(self.name, 0)
+
+
+class FakeLibrary:
+    """Stands in for libX11 / libXtst: records calls, returns canned values."""
+
+    def __init__(self, calls, returns):
+        self.calls = calls
+        self.returns = returns
+
+    def __getattr__(self, name):
+        function = FakeFunction(name, self)
+        setattr(self, name, function)
+        return function
+
+
+@pytest.fixture
+def x_without_xtest(monkeypatch):
+    calls = []
+    returns = {'XOpenDisplay': 1, 'XTestQueryExtension': 0}
+    monkeypatch.setattr(keystroke_backends, '_load_x_library', lambda name: FakeLibrary(calls, returns))
+    monkeypatch.setenv('DISPLAY', ':99')
+    return calls
+
+
+def test_xtest_missing_extension_raises_oserror(x_without_xtest):
+    with pytest.raises(OSError, match='XTest'):
+        XTestBackend()
+    assert 'XCloseDisplay' in x_without_xtest
+
+
+@pytest.mark.skipif(sys.platform in ('win32', 'darwin'), reason='X11 Unicode input')
+def test_unicode_input_without_xtest_degrades(x_without_xtest):
+    unicode_input = keystroke_backends.open_unicode_input()
+    assert isinstance(unicode_input, keystroke_backends._MissingUnicodeInput)
+
+
+class PreparingBackend(keystroke_backends.RecordingBackend):
+    def prepare(self, chars):
+        self.prepared = set(chars)
+
+
+def test_streamed_text_prepares_non_ascii_characters():
+    text = "Grüße aus Köln, 日本"
+    backend = PreparingBackend()
+    human_typer.type_text(iter([text]), start_delay=0, backend=backend, error_rate=0, wpm=3000,
+                          special_chars=human_typer.non_ascii_chars(text))
+    assert backend.prepared == {'ü', 'ß', 'ö', '日', '本'}
+    assert backend.output() == text
@@ -0,0 +1,13 @@
+from typer_daemon import JOB_DEFAULTS, KEEP_FINISHED, JobQueue
+
+
+def test_finished_jobs_drop_text_and_are_pruned():
+    jobs = JobQueue()
+    for _ in range(KEEP_FINISHED + 50):
+        job = jobs.submit('some text', dict(JOB_DEFAULTS))
+        jobs.cancel(job.id)
+        assert job.text is None and job.to_dict()['chars'] == 9
+
+    latest = jobs.submit('next', dict(JOB_DEFAULTS))
+    assert sum(job.finished for job in jobs.jobs.values()) == KEEP_FINISHED
+    assert latest.id in jobs.jobs and jobs.next() is latest
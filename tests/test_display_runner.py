@@ -0,0 +1,30 @@
+import queue
+import signal
+import threading
+
+from display_runner import RunStatus, _display_worker, assign_jobs
+
+JOBS = [{'text': 'Hello there. Bye.', 'wpm': 1000, 'error_rate': 0.06, 'suppress_indent': False, 'seed': 1}]
+
+
+def run_worker(monkeypatch, stop_event):
+    # The worker ignores SIGINT and sets $DISPLAY for its process; keep both out of the test run
+    monkeypatch.setattr(signal, 'signal', lambda *args: None)
+    monkeypatch.setenv('DISPLAY', ':0')
+    assigned = assign_jobs(JOBS, [':91'])
+    updates = queue.Queue()
+    _display_worker(':91', assigned[':91'], 'null', 0, stop_event, updates)
+    status = RunStatus(assigned)
+    while not updates.empty():
+        status.update(*updates.get())
+    return status.to_dict()['displays'][':91']
+
+
+def test_display_done_after_its_jobs(monkeypatch):
+    assert run_worker(monkeypatch, threading.Event())['state'] == 'done'
+
+
+def test_display_stopped(monkeypatch):
+    stop_event = threading.Event()
+    stop_event.set()
+    assert run_worker(monkeypatch, stop_event)['state'] == 'stopped'
@@ -0,0 +1,48 @@
+import random
+import time
+
+import batch_planner
+import human_typer
+from batch_planner import plan_parallel
+from human_typer import PLAN_PIECE_MAX_CHARS, iter_keystrokes, plan_keystrokes, split_pieces
+
+
+def sample_text(size, rng):
+    words = ['the', 'quick', 'brown', 'fox', 'jumps', 'over', 'lazy', 'dog', 'typing']
+    out = []
+    while sum(map(len, out)) < size:
+        out.append(rng.choice(words) + rng.choice([' ', ' ', ' ', '. ', '! ', '\n', ', ']))
+    return ''.join(out)
+
+
+def test_first_event_of_unbroken_stream_is_prompt():
+    # No newline or sentence end anywhere: pieces must still be cut at PLAN_PIECE_MAX_CHARS
+    pulled = [0]
+
+    def chunks():
+        for _ in range(2_000_000 // 4096):
+            pulled[0] += 4096
+            yield 'word ' * 819 + 'w'
+
+    started = time.perf_counter()
+    next(iter_keystrokes(chunks(), seed=1))
+    assert time.perf_counter() - started < 3.0
+    assert pulled[0] <= PLAN_PIECE_MAX_CHARS + 2 * 4096
+
+
+def test_parallel_plan_matches_serial_and_streamed(monkeypatch):
+    monkeypatch.setattr(human_typer, 'PLAN_PIECE_CHARS', 2000)
+    monkeypatch.setattr(human_typer, 'PLAN_PIECE_MAX_CHARS', 4000)
+    monkeypatch.setattr(batch_planner, 'PLAN_PIECE_CHARS', 2000)
+    rng = random.Random(5)
+    # Sentences, then a long run without line breaks or sentence ends (hard cuts), then sentences again
+    text = sample_text(12_000, rng) + 'word ' * 3000 + sample_text(8_000, rng)
+    assert len(split_pieces(text)) > 8
+
+    serial = plan_keystrokes(text, seed=11)
+    parallel = plan_parallel(text, seed=11, jobs=2)
+    streamed = list(iter_keystrokes((text[i:i + 997] for i in range(0, len(text), 997)), seed=11))
+
+    assert list(parallel) == list(serial)
+    assert streamed == list(serial)
+    assert parallel.meta == serial.meta
@@ -0,0 +1,48 @@
+import threading
+
+from checkpoint import Checkpoint, load_checkpoint
+from human_typer import VirtualClock, execute_plan, plan_keystrokes, prepare_text, skip_typed
+from keystroke_backends import RecordingBackend
+
+TEXT = "The quick brown fox. Jumps over\nthe lazy dog, twice!"
+
+
+class StoppingBackend(RecordingBackend):
+    """Records keys and sets stop_event once after keys have been sent."""
+
+    def __init__(self, stop_event, after):
+        super().__init__()
+        self.stop_event = stop_event
+        self.after = after
+        self.sent = 0
+
+    def _sent(self):
+        self.sent += 1
+        if self.sent == self.after:
+            self.stop_event.set()
+
+    def write(self, text):
+        super().write(text)
+        self._sent()
+
+    def backspace(self, count=1):
+        super().backspace(count)
+        self._sent()
+
+
+def test_resume_after_stop_at_every_event(tmp_path):
+    plan = plan_keystrokes(TEXT, error_rate=0.5, seed=3)
+    assert any(action == 1 for _, action, _ in plan)  # The plan has typos to stop inside
+    path = tmp_path / 'checkpoint.json'
+
+    for stop_at in range(1, len(plan) + 1):
+        stop_event = threading.Event()
+        backend = StoppingBackend(stop_event, stop_at)
+        checkpoint = Checkpoint('digest', {}, path=path)
+        execute_plan(plan, stop_event, backend, clock=VirtualClock(), checkpoint=checkpoint)
+        checkpoint.close()
+
+        state = load_checkpoint(path)
+        resumed = skip_typed(plan, state['offset'], state['stray'])
+        execute_plan(resumed, backend=backend, clock=VirtualClock())
+        assert backend.output() == prepare_text(TEXT), f"stopped after event {stop_at}"
@@ -0,0 +1,24 @@
+from human_typer import KeystrokePlan, plan_keystrokes
+from plan_cache import PlanCache
+
+
+def test_save_load_roundtrip(tmp_path):
+    plan = plan_keystrokes("Hello world. This is a test.", seed=5)
+    plan.save(tmp_path / 's.hts')
+    loaded = KeystrokePlan.load(tmp_path / 's.hts')
+    assert list(loaded) == list(plan)
+    assert loaded.meta == plan.meta
+
+
+def test_save_of_cached_plan(tmp_path):
+    # A cache hit is mapped from disk (memoryview arrays); saving it must still work
+    cache = PlanCache(tmp_path / 'cache')
+    plan = plan_keystrokes("Hello world. This is a test.", seed=5)
+    cache.put('k', plan)
+    cached = cache.get('k')
+    assert isinstance(cached.delays, memoryview)
+    cached.save(tmp_path / 'a.hts')
+    cached.save(tmp_path / 'a.hts')
+    assert list(KeystrokePlan.load(tmp_path / 'a.hts')) == list(plan)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['a.hts', 'cache']
+
@@ -0,0 +1,36 @@
+import threading
+import time
+
+from benchmark import STOP_BUDGET_MS
+from human_typer import ACTION_TYPE, KeystrokePlan, execute_plan, sleep_or_stop
+from keystroke_backends import NullBackend
+
+
+def stop_latency_ms(run, after=0.1):
+    """Run run(stop_event) with the stop event set after seconds; ms from setting it to run returning."""
+    stop_event = threading.Event()
+    stopped_at = []
+
+    def press_stop():
+        stopped_at.append(time.perf_counter())
+        stop_event.set()
+
+    timer = threading.Timer(after, press_stop)
+    timer.start()
+    run(stop_event)
+    returned = time.perf_counter()
+    timer.join()
+    return (returned - stopped_at[0]) * 1000
+
+
+def test_execute_plan_stops_during_long_delay():
+    plan = KeystrokePlan()
+    plan.append('x', ACTION_TYPE, 0.01)
+    plan.append('y', ACTION_TYPE, 30.0)  # A long thinking pause / natural break
+    plan.append('z', ACTION_TYPE, 0.01)
+    assert stop_latency_ms(lambda stop_event: execute_plan(plan, stop_event, NullBackend())) < STOP_BUDGET_MS
+
+
+def test_countdown_stops_promptly():
+    # The GUI's countdown waits one second per tick with sleep_or_stop()
+    assert stop_latency_ms(lambda stop_event: sleep_or_stop(1, stop_event), after=0.3) < STOP_BUDGET_MS
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Data-driven keystroke timing for Human Typer.
+
+A TimingModel holds the rhythm of a typist as log-normal parameters
+(mu, sigma of log(interval / mean interval)) per bigram and trigram of
+key slots. Characters map to one of SLOTS slots (letters case-folded,
+digits, whitespace, common punctuation, one slot for everything else),
+so the tables are flat float32 arrays indexed by slot arithmetic:
+O(1) and allocation-free per key. Missing trigrams fall back to the
+bigram, missing bigrams to the plain jitter of DEFAULT_SIGMA.
+
+Intervals are stored relative to the typist's mean, so one table works
+at any WPM; --wpm still sets the overall speed.
+
+Build a table from a keystroke log (lines of "<seconds>\\t<key>", key a
+literal character or a name like space/enter/tab/backspace) or, without
+timings, from a text corpus (frequent n-grams and hand alternation get
+faster, same-finger reaches slower):
+
+  python3 timing_model.py build --log keys.tsv -o my.htt
+  python3 timing_model.py build --corpus essays.txt -o corpus.htt
+  python3 timing_model.py info my.htt
+  python3 human_typer.py -f essay.txt --timing-model my.htt
+"""
+
+import hashlib
+import json
+import math
+import random
+import struct
+import sys
+from array import array
+
+# Case-folded alphabet of the tables; every other character shares the last slot
+SLOT_CHARS = "abcdefghijklmnopqrstuvwxyz0123456789 \n\t.,;:!?'\"()[]{}-_=+*/\\<>&"
+SLOTS = 64
+OTHER = SLOTS - 1
+
+# Code point (< 128) -> slot
+SLOT_OF = bytes(SLOT_CHARS.find(chr(c).lower()) if chr(c).lower() in SLOT_CHARS else OTHER for c in range(128))
+
+# Spread of an n-gram the table knows nothing about (log-normal sigma, ~±25%)
+DEFAULT_SIGMA = 0.25
+
+# Extra log-time for a shifted (uppercase) key
+SHIFT_MU = math.log(1.15)
+
+# Observations an n-gram needs before it gets its own entry
+MIN_SAMPLES = 5
+
+# Gaps longer than this in a log are thinking pauses, not rhythm; they also split sessions
+PAUSE_CUTOFF = 2.0
+
+# Model file layout: magic | header length (uint32 LE) | JSON header | padding to 4 bytes
+# | bigram mu, bigram sigma, trigram mu, trigram sigma (float32 LE, NaN = unknown)
+MODEL_MAGIC = b'HTTIME1\0'
+
+_NAN = float('nan')
+
+_KEY_NAMES = {'space': ' ', 'enter': '\n', 'return': '\n', 'tab': '\t'}
+
+
+def slot(char):
+    """Table slot of a character."""
+    code = ord(char)
+    return SLOT_OF[code] if code < 128 else OTHER
+
+
+class TimingModel:
+    """Bigram/trigram log-normal delay tables."""
+
+    def __init__(self, meta=None):
+        self.bi_mu = array('f', [_NAN]) * (SLOTS * SLOTS)
+        self.bi_sigma = array('f', [_NAN]) * (SLOTS * SLOTS)
+        self.tri_mu = array('f', [_NAN]) * (SLOTS * SLOTS * SLOTS)
+        self.tri_sigma = array('f', [_NAN]) * (SLOTS * SLOTS * SLOTS)
+        self.meta = dict(meta or {})
+        self._digest = None
+
+    def key_delay(self, base_delay, prev2, prev, char, rng=random):
+        """
+        Interval from key prev to key char, with prev2 the key before prev ('' at the start).
+        base_delay is the typist's mean interval (from WPM).
+        """
+        c = ord(char)
+        s2 = SLOT_OF[c] if c < 128 else OTHER
+        c = ord(prev) if prev else 10
+        s1 = SLOT_OF[c] if c < 128 else OTHER
+        c = ord(prev2) if prev2 else 10
+        s0 = SLOT_OF[c] if c < 128 else OTHER
+
+        i2 = s1 * SLOTS + s2
+        i3 = s0 * (SLOTS * SLOTS) + i2
+        mu = self.tri_mu[i3]
+        if mu == mu:
+            sigma = self.tri_sigma[i3]
+        else:
+            mu = self.bi_mu[i2]
+            if mu == mu:
+                sigma = self.bi_sigma[i2]
+            else:
+                mu, sigma = 0.0, DEFAULT_SIGMA
+        if char.isupper():
+            mu += SHIFT_MU
+        # exp(gauss) rather than lognormvariate(): gauss() makes normals in pairs and is cheaper
+        return base_delay * math.exp(mu + sigma * rng.gauss(0.0, 1.0))
+
+    @property
+    def digest(self):
+        """Content hash, e.g. for plan cache keys."""
+        if self._digest is None:
+            h = hashlib.sha256()
+            for arr in (self.bi_mu, self.bi_sigma, self.tri_mu, self.tri_sigma):
+                h.update(arr.tobytes())
+            self._digest = h.hexdigest()
+        return self._digest
+
+    def known(self):
+        """Number of (bigram, trigram) entries with data."""
+        return (sum(1 for mu in self.bi_mu if mu == mu), sum(1 for mu in self.tri_mu if mu == mu))
+
+    def save(self, path):
+        header = json.dumps(dict(self.meta, slots=SLOTS, alphabet=SLOT_CHARS)).encode('utf-8')
+        padding = -(len(MODEL_MAGIC) + 4 + len(header)) % 4
+        with open(path, 'wb') as f:
+            f.write(MODEL_MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header + b' ' * padding)
+            for arr in (self.bi_mu, self.bi_sigma, self.tri_mu, self.tri_sigma):
+                if sys.byteorder == 'big':
+                    arr = array('f', arr)
+                    arr.byteswap()
+                arr.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            if f.read(len(MODEL_MAGIC)) != MODEL_MAGIC:
+                raise ValueError(f"{path} is not a Human Typer timing model")
+            header_len, = struct.unpack('<I', f.read(4))
+            meta = json.loads(f.read(header_len))
+            f.read(-(len(MODEL_MAGIC) + 4 + header_len) % 4)
+            if meta.pop('slots') != SLOTS or meta.pop('alphabet') != SLOT_CHARS:
+                raise ValueError(f"{path} was built for a different key alphabet")
+
+            model = cls(meta)
+            for arr in (model.bi_mu, model.bi_sigma, model.tri_mu, model.tri_sigma):
+                count = len(arr)
+                del arr[:]
+                arr.fromfile(f, count)
+                if sys.byteorder == 'big':
+                    arr.byteswap()
+        return model
+
+
+# ──────────────────────────────────────────────────────
+# Building tables
+# ──────────────────────────────────────────────────────
+
+class _Stats:
+    """Running count / mean / M2 (Welford) per table index."""
+
+    def __init__(self, size):
+        self.n = array('I', bytes(4 * size))
+        self.mean = array('d', bytes(8 * size))
+        self.m2 = array('d', bytes(8 * size))
+
+    def add(self, i, x):
+        self.n[i] += 1
+        delta = x - self.mean[i]
+        self.mean[i] += delta / self.n[i]
+        self.m2[i] += delta * (x - self.mean[i])
+
+    def fill(self, mu, sigma, min_samples=MIN_SAMPLES):
+        for i, n in enumerate(self.n):
+            if n >= min_samples:
+                mu[i] = self.mean[i]
+                sigma[i] = max(0.05, math.sqrt(self.m2[i] / (n - 1)))
+
+
+def read_key_log(path):
+    """Yield sessions (lists of (seconds, char)) from a "<seconds>\\t<key>" log."""
+    session = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            if not line.strip():
+                if session:
+                    yield session
+                session = []
+                continue
+            stamp, _, key = line.partition('\t')
+            key = _KEY_NAMES.get(key.lower(), key) if len(key) > 1 else key
+            t = float(stamp)
+            if session and t - session[-1][0] > PAUSE_CUTOFF:
+                yield session
+                session = []
+            session.append((t, key))
+    if session:
+        yield session
+
+
+def build_from_log(paths, min_samples=MIN_SAMPLES):
+    """Fit a TimingModel to the inter-key intervals of keystroke logs."""
+    bigrams = _Stats(SLOTS * SLOTS)
+    trigrams = _Stats(SLOTS * SLOTS * SLOTS)
+    samples = 0
+
+    for path in paths:
+        for session in read_key_log(path):
+            intervals = [b[0] - a[0] for a, b in zip(session, session[1:])]
+            positive = [i for i in intervals if i > 0]
+            if not positive:
+                continue
+            mean = sum(positive) / len(positive)
+
+            for n in range(1, len(session)):
+                key, interval = session[n][1], intervals[n - 1]
+                prev = session[n - 1][1]
+                # Named keys other than whitespace (backspace, arrows, ...) break the context
+                if len(key) != 1 or len(prev) != 1 or interval <= 0:
+                    continue
+                x = math.log(interval / mean)
+                i2 = slot(prev) * SLOTS + slot(key)
+                bigrams.add(i2, x)
+                if n >= 2 and len(session[n - 2][1]) == 1:
+                    trigrams.add(slot(session[n - 2][1]) * SLOTS * SLOTS + i2, x)
+                samples += 1
+
+    model = TimingModel({'source': 'log', 'samples': samples})
+    bigrams.fill(model.bi_mu, model.bi_sigma, min_samples)
+    trigrams.fill(model.tri_mu, model.tri_sigma, min_samples)
+    return model
+
+
+# QWERTY finger columns: 0-3 left hand (pinky..index), 4-7 right hand (index..pinky)
+_FINGER = {}
+for _column, _keys in enumerate(('qaz1', 'wsx2', 'edc3', 'rfvtgb45', 'yhnujm67', 'ik,8', 'ol.9', 'p;/0-=[]\'')):
+    for _key in _keys:
+        _FINGER[_key] = _column
+
+
+def _reach(prev, char):
+    """Log-time adjustment for moving from key prev to key char on QWERTY."""
+    a, b = _FINGER.get(prev), _FINGER.get(char)
+    if a is None or b is None:
+        return 0.0
+    if prev == char:
+        return -0.05  # Double letter: same finger, no travel
+    if a == b:
+        return 0.25   # Same finger, different key
+    if (a < 4) != (b < 4):
+        return -0.10  # Hand alternation
+    return 0.0
+
+
+def build_from_corpus(paths, min_samples=MIN_SAMPLES):
+    """
+    Estimate a TimingModel from plain text: n-grams are faster the more
+    often they occur (practice), and keyboard reach adds or removes time.
+    """
+    bi_counts = array('I', bytes(4 * SLOTS * SLOTS))
+    tri_counts = array('I', bytes(4 * SLOTS * SLOTS * SLOTS))
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            s0 = s1 = slot('\n')
+            for chunk in iter(lambda: f.read(64 * 1024), ''):
+                for char in chunk:
+                    s2 = slot(char)
+                    bi_counts[s1 * SLOTS + s2] += 1
+                    tri_counts[(s0 * SLOTS + s1) * SLOTS + s2] += 1
+                    s0, s1 = s1, s2
+
+    def practice(counts):
+        """Standardized log frequency of every n-gram seen min_samples times."""
+        logs = {i: math.log(n) for i, n in enumerate(counts) if n >= min_samples}
+        if len(logs) < 2:
+            return {}
+        mean = sum(logs.values()) / len(logs)
+        std = math.sqrt(sum((x - mean) ** 2 for x in logs.values()) / len(logs)) or 1.0
+        return {i: max(-2.0, min(2.0, (x - mean) / std)) for i, x in logs.items()}
+
+    model = TimingModel({'source': 'corpus', 'samples': sum(bi_counts)})
+    for i, z in practice(bi_counts).items():
+        prev, char = SLOT_CHARS[i // SLOTS:i // SLOTS + 1], SLOT_CHARS[i % SLOTS:i % SLOTS + 1]
+        model.bi_mu[i] = -0.15 * z + _reach(prev, char)
+        model.bi_sigma[i] = DEFAULT_SIGMA
+    for i, z in practice(tri_counts).items():
+        i2 = i % (SLOTS * SLOTS)
+        if model.bi_mu[i2] == model.bi_mu[i2]:
+            model.tri_mu[i] = model.bi_mu[i2] - 0.05 * z
+            model.tri_sigma[i] = DEFAULT_SIGMA * 0.9
+    return model
+
+
+def _slot_name(s):
+    char = SLOT_CHARS[s] if s < len(SLOT_CHARS) else '…'
+    return {' ': '␣', '\n': '⏎', '\t': '⇥'}.get(char, char)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or inspect Human Typer timing models.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('build', help='Build a model from keystroke logs or a text corpus')
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument('--log', action='append', help='Keystroke log: "<seconds>\\t<key>" per line (repeat)')
+    src.add_argument('--corpus', action='append', help='Plain text to estimate timings from (repeat)')
+    p.add_argument('-o', '--output', required=True, help='Model file to write')
+    p.add_argument('--min-samples', type=int, default=MIN_SAMPLES,
+                   help=f'Observations needed per n-gram (default: {MIN_SAMPLES})')
+    p = sub.add_parser('info', help='Summarize a model')
+    p.add_argument('model')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if args.log:
+            model = build_from_log(args.log, args.min_samples)
+        else:
+            model = build_from_corpus(args.corpus, args.min_samples)
+        model.save(args.output)
+        bigrams, trigrams = model.known()
+        print(f"💾 Wrote {args.output}: {bigrams} bigrams, {trigrams} trigrams "
+              f"from {model.meta['samples']} {'intervals' if args.log else 'characters'}")
+        return
+
+    model = TimingModel.load(args.model)
+    bigrams, trigrams = model.known()
+    print(f"📈 {args.model} ({model.meta.get('source', '?')}, {model.meta.get('samples', 0)} samples): "
+          f"{bigrams} bigrams, {trigrams} trigrams")
+    ranked = sorted((mu, i) for i, mu in enumerate(model.bi_mu) if mu == mu)
+    for title, rows in (('Fastest', ranked[:10]), ('Slowest', ranked[-10:][::-1])):
+        print(f"  {title} bigrams: " + '  '.join(
+            f"{_slot_name(i // SLOTS)}{_slot_name(i % SLOTS)} x{math.exp(mu):.2f}" for mu, i in rows))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Human Typer - Job daemon.
+Keeps one keystroke backend warm and types queued jobs one after another,
+so scripts submitting many jobs pay for imports and backend start-up once.
+
+Protocol: newline-delimited JSON over a Unix socket (default) or localhost TCP.
+Each connection sends one request and reads one or more JSON lines back:
+  {"op": "submit", "text": "...", "wpm": 60, "error_rate": 0.06, "suppress_indent": false,
+   "seed": null, "priority": 0, "start_delay": 0, "watch": false}
+                                     -> {"ok": true, "job": {...}}, then progress lines if watch
+  {"op": "watch", "id": 3}           -> progress lines until the job ends
+  {"op": "cancel", "id": 3}          -> {"ok": true}
+  {"op": "list"}                     -> {"ok": true, "jobs": [...]}
+  {"op": "shutdown"}                 -> {"ok": true}
+Higher priority jobs run first; equal priorities run in submission order.
+Malformed requests get {"ok": false, "error": "..."}. TCP is only served on
+loopback addresses: anyone who can connect can type into this desktop.
+
+Usage:
+  python3 typer_daemon.py serve                       # Listen on the default Unix socket
+  python3 typer_daemon.py serve --listen 127.0.0.1:8765
+  python3 typer_daemon.py submit -f essay.txt --wpm 80 --priority 5 --watch
+  python3 typer_daemon.py list
+  python3 typer_daemon.py cancel 3
+  python3 typer_daemon.py shutdown
+"""
+
+import argparse
+import heapq
+import ipaddress
+import itertools
+import json
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+
+import human_typer
+from keystroke_backends import BACKENDS, DEFAULT_BACKEND, get_backend
+
+# Keys between progress messages to watchers
+PROGRESS_EVERY = 50
+
+# Finished jobs kept for list/watch; older ones are forgotten as new jobs come in
+KEEP_FINISHED = 100
+
+JOB_FIELDS = ('wpm', 'error_rate', 'suppress_indent', 'seed', 'start_delay')
+
+JOB_DEFAULTS = {'wpm': 60, 'error_rate': 0.06, 'suppress_indent': False, 'seed': None, 'start_delay': 0}
+
+
+def default_socket_path():
+    base = os.environ.get('XDG_RUNTIME_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'human_typer')
+    return os.path.join(base, 'human_typer.sock')
+
+
+# ──────────────────────────────────────────────────────
+# Jobs
+# ──────────────────────────────────────────────────────
+
+class Job:
+    """One queued typing job and the watchers following its progress."""
+
+    def __init__(self, job_id, text, params, priority=0):
+        self.id = job_id
+        self.text = text  # Dropped once the job has finished
+        self.chars = len(text)
+        self.params = params
+        self.priority = priority
+        self.state = 'queued'  # queued -> running -> done / cancelled / failed
+        self.error = None
+        self.progress = {'typed': 0, 'keys': 0, 'typos': 0, 'wpm': 0.0}
+        self.stop_event = threading.Event()
+        self._watchers = []
+        self._lock = threading.Lock()
+
+    def to_dict(self):
+        return {'id': self.id, 'state': self.state, 'priority': self.priority, 'chars': self.chars,
+                'progress': self.progress, 'error': self.error, **self.params}
+
+    @property
+    def finished(self):
+        return self.state in ('done', 'cancelled', 'failed')
+
+    def finish(self, state, error=None):
+        """End the job in state (done / cancelled / failed) and tell the watchers."""
+        self.state = state
+        self.error = error
+        self.text = None
+        self.publish()
+
+    def watch(self, initial=True):
+        """Queue receiving the current state (if initial), then every update (None after the final one)."""
+        q = queue.Queue()
+        with self._lock:
+            if initial:
+                q.put(self.to_dict())
+            if self.finished:
+                q.put(None)
+            else:
+                self._watchers.append(q)
+        return q
+
+    def unwatch(self, q):
+        """Stop sending updates to q (its client went away)."""
+        with self._lock:
+            if q in self._watchers:
+                self._watchers.remove(q)
+
+    def publish(self):
+        with self._lock:
+            update = self.to_dict()
+            for q in self._watchers:
+                q.put(update)
+                if self.finished:
+                    q.put(None)
+            if self.finished:
+                self._watchers = []
+
+
+class JobQueue:
+    """Priority queue of jobs; cancelled jobs are skipped when they come up."""
+
+    def __init__(self):
+        self.jobs = {}
+        self._heap = []
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self.closed = False
+
+    def submit(self, text, params, priority=0):
+        with self._cond:
+            job = Job(next(self._ids), text, params, priority)
+            self.jobs[job.id] = job
+            heapq.heappush(self._heap, (-priority, job.id, job))
+            self._prune()
+            self._cond.notify()
+        return job
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:-KEEP_FINISHED]:
+            del self.jobs[job_id]
+
+    def next(self):
+        """Block until a job is due; None once the queue is closed."""
+        with self._cond:
+            while True:
+                while self._heap:
+                    _, _, job = heapq.heappop(self._heap)
+                    if job.state == 'queued':
+                        job.state = 'running'
+                        return job
+                if self.closed:
+                    return None
+                self._cond.wait()
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.stop_event.set()
+        with self._cond:
+            if job.state == 'queued':
+                job.finish('cancelled')
+        return True
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            for job in self.jobs.values():
+                job.stop_event.set()
+            self._cond.notify_all()
+
+
+# ──────────────────────────────────────────────────────
+# Daemon
+# ──────────────────────────────────────────────────────
+
+class TyperDaemon:
+    """Runs jobs from a JobQueue on one long-lived backend."""
+
+    def __init__(self, backend=None):
+        self.backend = get_backend(backend)
+        self.queue = JobQueue()
+        self._worker = threading.Thread(target=self._work, name='human-typer-jobs', daemon=True)
+
+    def start(self):
+        self._worker.start()
+
+    def stop(self):
+        self.queue.close()
+        self._worker.join()
+        self.backend.close()
+
+    def _work(self):
+        from typing_metrics import TypingMetrics
+
+        while True:
+            job = self.queue.next()
+            if job is None:
+                return
+            job.publish()
+
+            def progress(metrics, job=job):
+                job.progress = {'typed': metrics.typed, 'keys': metrics.keys, 'typos': metrics.typos,
+                                'wpm': round(metrics.achieved_wpm, 1)}
+                job.publish()
+
+            metrics = TypingMetrics(callback=progress, callback_every=PROGRESS_EVERY)
+            try:
+                human_typer.type_text(job.text, wpm=job.params['wpm'], error_rate=job.params['error_rate'],
+                                      start_delay=job.params['start_delay'], stop_event=job.stop_event,
+                                      suppress_indent=job.params['suppress_indent'], seed=job.params['seed'],
+                                      backend=self.backend, metrics=metrics)
+                progress(metrics)
+                job.finish('cancelled' if job.stop_event.is_set() else 'done')
+            except Exception as e:
+                job.finish('failed', f'{type(e).__name__}: {e}')
+
+    def handle(self, request, send):
+        """Serve one request; send(obj) writes a JSON line back to the client."""
+        if not isinstance(request, dict):
+            return send({'ok': False, 'error': 'Bad request'})
+        op = request.get('op')
+
+        if op == 'submit':
+            text = request.get('text')
+            if not isinstance(text, str) or not text.strip():
+                return send({'ok': False, 'error': 'No text provided'})
+            try:
+                params, priority, watch = job_request(request)
+            except ValueError as e:
+                return send({'ok': False, 'error': str(e)})
+            job = self.queue.submit(text, params, priority)
+            updates = job.watch(initial=False) if watch else None
+            send({'ok': True, 'job': job.to_dict()})
+            if updates:
+                self._stream(job, updates, send)
+
+        elif op == 'watch':
+            if not _is_int(request.get('id')):
+                return send({'ok': False, 'error': 'id must be an integer'})
+            job = self.queue.jobs.get(request['id'])
+            if job is None:
+                return send({'ok': False, 'error': f"No job {request.get('id')}"})
+            self._stream(job, job.watch(), send)
+
+        elif op == 'cancel':
+            if not _is_int(request.get('id')):
+                return send({'ok': False, 'error': 'id must be an integer'})
+            send({'ok': self.queue.cancel(request['id'])})
+
+        elif op == 'list':
+            send({'ok': True, 'jobs': [job.to_dict() for job in self.queue.jobs.values()]})
+
+        elif op == 'shutdown':
+            send({'ok': True})
+            raise SystemExit
+
+        else:
+            send({'ok': False, 'error': f'Unknown op {op!r}'})
+
+    @staticmethod
+    def _stream(job, updates, send):
+        try:
+            while True:
+                update = updates.get()
+                if update is None:
+                    return
+                send({'ok': True, 'job': update})
+        finally:
+            job.unwatch(updates)
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def job_request(request):
+    """
+    Validate the job fields of a submit request (missing or null ones get JOB_DEFAULTS).
+    Returns (params, priority, watch); raises ValueError naming the first bad field.
+    """
+    params = dict(JOB_DEFAULTS)
+    params.update((k, request[k]) for k in JOB_FIELDS if request.get(k) is not None)
+    priority = request.get('priority')
+    priority = 0 if priority is None else priority
+    watch = request.get('watch') or False
+
+    if not _is_number(params['wpm']) or not 0 < params['wpm'] <= 1000:
+        raise ValueError('wpm must be a number in (0, 1000]')
+    if not _is_number(params['error_rate']) or not 0 <= params['error_rate'] <= 1:
+        raise ValueError('error_rate must be a number in [0, 1]')
+    if not isinstance(params['suppress_indent'], bool):
+        raise ValueError('suppress_indent must be true or false')
+    if params['seed'] is not None and not _is_int(params['seed']):
+        raise ValueError('seed must be an integer or null')
+    if not _is_int(params['start_delay']) or params['start_delay'] < 0:
+        raise ValueError('start_delay must be a non-negative integer')
+    if not _is_int(priority):
+        raise ValueError('priority must be an integer')
+    if not isinstance(watch, bool):
+        raise ValueError('watch must be true or false')
+    return params, priority, watch
+
+
+def _make_handler(daemon, server_box):
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            def send(obj):
+                self.wfile.write(json.dumps(obj).encode('utf-8') + b'\n')
+                self.wfile.flush()
+
+            try:
+                request = json.loads(self.rfile.readline())
+            except ValueError:
+                return send({'ok': False, 'error': 'Bad request'})
+            try:
+                daemon.handle(request, send)
+            except SystemExit:
+                threading.Thread(target=server_box[0].shutdown, daemon=True).start()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # Watcher went away; the job keeps running
+
+    return Handler
+
+
+def parse_listen(value):
+    """HOST:PORT for TCP (loopback hosts only), anything else is a Unix socket path."""
+    host, sep, port = value.rpartition(':')
+    if sep and port.isdigit():
+        host = host or '127.0.0.1'
+        if not is_loopback(host):
+            raise argparse.ArgumentTypeError(
+                f"{host} is not a loopback address; anyone who can connect to the daemon can type "
+                f"into this desktop, so it only listens on 127.0.0.1 / localhost")
+        return host, int(port)
+    return value
+
+
+def is_loopback(host):
+    """True if every address host resolves to is a loopback address."""
+    try:
+        infos = socket.getaddrinfo(host.strip('[]'), None)
+    except (socket.gaierror, UnicodeError):
+        return False
+    return bool(infos) and all(ipaddress.ip_address(info[4][0].split('%')[0]).is_loopback for info in infos)
+
+
+def serve(address, backend=None):
+    if isinstance(address, tuple) and not is_loopback(address[0]):
+        raise ValueError(f"Refusing to listen on non-loopback address {address[0]}")
+    daemon = TyperDaemon(backend)
+    server_box = []
+    handler = _make_handler(daemon, server_box)
+
+    if isinstance(address, tuple):
+        server = socketserver.ThreadingTCPServer(address, handler)
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(address)), exist_ok=True)
+        if os.path.exists(address):
+            os.remove(address)  # Stale socket from a previous daemon
+        old_umask = os.umask(0o177)  # Socket only usable by this user
+        try:
+            server = socketserver.ThreadingUnixStreamServer(address, handler)
+        finally:
+            os.umask(old_umask)
+    server.daemon_threads = True
+    server_box.append(server)
+
+    daemon.start()
+    print(f"🟢 Human Typer daemon ({daemon.backend.name} backend) listening on: {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.stop()
+        if not isinstance(address, tuple) and os.path.exists(address):
+            os.remove(address)
+    print("🔴 Daemon stopped.")
+
+
+# ──────────────────────────────────────────────────────
+# Client
+# ──────────────────────────────────────────────────────
+
+def request(address, payload):
+    """Send one request to the daemon and yield every reply line."""
+    if isinstance(address, tuple):
+        sock = socket.create_connection(address)
+    else:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(address)
+    with sock, sock.makefile('rwb') as f:
+        f.write(json.dumps(payload).encode('utf-8') + b'\n')
+        f.flush()
+        for line in f:
+            yield json.loads(line)
+
+
+def print_job(job):
+    p = job['progress']
+    print(f"  #{job['id']:<4} {job['state']:<9} prio {job['priority']:>3} | "
+          f"{p['typed']}/{job['chars']} chars | {p['typos']} typos | {p['wpm']:.0f} WPM"
+          + (f" | {job['error']}" if job['error'] else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Human Typer job daemon and client.")
+    parser.add_argument('--listen', type=parse_listen, default=None, metavar='ADDR',
+                        help='Unix socket path or HOST:PORT (default: $XDG_RUNTIME_DIR/human_typer.sock)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('serve', help='Run the daemon')
+    p.add_argument('--backend', choices=sorted(BACKENDS), default=DEFAULT_BACKEND,
+                   help=f'Keystroke backend kept warm for all jobs (default: {DEFAULT_BACKEND})')
+
+    p = sub.add_parser('submit', help='Queue a typing job')
+    p.add_argument('-f', '--file', help='Path to text file to type')
+    p.add_argument('-t', '--text', help='Text string to type')
+    p.add_argument('--wpm', type=int, help='Words per minute (default: 60)')
+    p.add_argument('--error-rate', type=float, help='Typo probability 0.0-1.0 (default: 0.06)')
+    p.add_argument('--anti-indent', action='store_true', help='Skip leading whitespace of new lines')
+    p.add_argument('--seed', type=int, help='RNG seed for a reproducible session')
+    p.add_argument('--delay', type=int, default=0, help='Seconds before the job starts typing (default: 0)')
+    p.add_argument('--priority', type=int, default=0, help='Higher runs first (default: 0)')
+    p.add_argument('--watch', action='store_true', help='Stream progress until the job ends')
+
+    p = sub.add_parser('watch', help='Stream progress of a job')
+    p.add_argument('id', type=int)
+    p = sub.add_parser('cancel', help='Cancel a queued or running job')
+    p.add_argument('id', type=int)
+    sub.add_parser('list', help='List jobs')
+    sub.add_parser('shutdown', help='Stop the daemon')
+
+    args = parser.parse_args()
+    address = args.listen or default_socket_path()
+
+    if args.command == 'serve':
+        try:
+            serve(address, args.backend)
+        except (ImportError, OSError, ValueError) as e:
+            print(f"❌ Cannot start the daemon: {e}")
+            sys.exit(1)
+        return
+
+    if args.command == 'submit':
+        if args.file:
+            with open(args.file, 'r', encoding='utf-8') as f:
+                text = f.read()
+        elif args.text:
+            text = args.text
+        else:
+            text = sys.stdin.read()
+        payload = {'op': 'submit', 'text': text, 'wpm': args.wpm, 'error_rate': args.error_rate,
+                   'suppress_indent': args.anti_indent, 'seed': args.seed, 'start_delay': args.delay,
+                   'priority': args.priority, 'watch': args.watch}
+    elif args.command in ('watch', 'cancel'):
+        payload = {'op': args.command, 'id': args.id}
+    else:
+        payload = {'op': args.command}
+
+    try:
+        for reply in request(address, payload):
+            if not reply['ok']:
+                print(f"❌ {reply.get('error', 'Request failed')}")
+                sys.exit(1)
+            if 'job' in reply:
+                print_job(reply['job'])
+            for job in reply.get('jobs', ()):
+                print_job(job)
+    except OSError as e:
+        print(f"❌ Cannot reach the daemon at {address}: {e}")
+        sys.exit(1)
+
+    if args.command == 'cancel':
+        print(f"🛑 Cancelled job #{args.id}")
+
+
+if __name__ == '__main__':
+    main()
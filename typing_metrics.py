@@ -0,0 +1,290 @@
+"""
+Hot-path instrumentation for the Human Typer engine.
+
+TypingMetrics is handed to execute_plan() / type_text() and records, per key:
+  - backend call latency
+  - sleep overshoot (how late a key went out vs its deadline)
+  - actual vs planned inter-key interval
+  - typo, backspace, correction and cursor movement counts
+  - planner -> injector queue depth, backpressure and starvation (streaming runs)
+
+Samples go into fixed-bucket histograms and a fixed-size ring buffer, so
+recording is O(1) and allocation-free. Results export as JSON or as a
+Prometheus text file, and can be read live through a callback.
+
+LiveProgress is a lighter channel for UIs: the executor publishes chars
+typed, typos and ETA into it per key, and the UI samples it on its own
+schedule instead of being called back from the typing thread.
+"""
+
+import json
+from array import array
+from bisect import bisect_left
+
+from human_typer import ACTION_BACKSPACE, ACTION_NAV, ACTION_TYPO
+
+# Histogram upper bounds in seconds (Prometheus 'le' buckets, +Inf implied)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Per-key samples kept for live inspection
+RING_SIZE = 1024
+
+
+class Histogram:
+    """Fixed-bucket histogram with cumulative export."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = array('Q', [0] * (len(buckets) + 1))  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Approximate quantile: upper bound of the bucket holding the q-th sample."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'max': self.max,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p99': self.quantile(0.99),
+            'buckets': {str(b): n for b, n in zip(self.buckets + ('+Inf',), self.counts)},
+        }
+
+
+class TypingMetrics:
+    """
+    Metrics sink for one typing run.
+    callback: Optional fn(metrics) called every callback_every keys, for live readouts.
+    """
+
+    def __init__(self, callback=None, callback_every=100):
+        self.backend_latency = Histogram()
+        self.sleep_overshoot = Histogram()
+        self.interval_error = Histogram()  # |actual - planned| inter-key interval
+
+        self.keys = 0
+        self.typed = 0
+        self.typos = 0
+        self.backspaces = 0
+        self.corrections = 0
+        self.moves = 0  # Cursor movements (incremental retype)
+
+        # Ring buffer of recent (planned interval, actual interval, backend latency)
+        self.ring_planned = array('d', [0.0] * RING_SIZE)
+        self.ring_actual = array('d', [0.0] * RING_SIZE)
+        self.ring_latency = array('d', [0.0] * RING_SIZE)
+
+        # Planner -> injector pipeline (see human_typer.pipeline_events)
+        self.queue_capacity = 0
+        self.queue_high_water = 0
+        self.backpressure_waits = 0     # Planner blocked on a full queue
+        self.backpressure_seconds = 0.0
+        self.starvation_waits = 0       # Injector waited on an empty queue
+        self.starvation_seconds = 0.0
+
+        self.callback = callback
+        self.callback_every = callback_every
+
+        self.started = None
+        self.finished = None
+        self._prev_emit = None
+        self._prev_delay = 0.0
+        self._in_correction = False
+
+    def record(self, key, action, delay, deadline, emitted, returned):
+        """
+        Record one emitted key.
+        delay: Planned pause after this key. deadline: When it was scheduled.
+        emitted / returned: Clock time just before and after the backend call.
+        """
+        if self.started is None:
+            self.started = emitted
+        self.finished = returned
+
+        latency = returned - emitted
+        self.backend_latency.observe(latency)
+        self.sleep_overshoot.observe(max(0.0, emitted - deadline))
+
+        actual = planned = 0.0
+        if self._prev_emit is not None:
+            actual = emitted - self._prev_emit
+            planned = self._prev_delay
+            self.interval_error.observe(abs(actual - planned))
+        self._prev_emit = emitted
+        self._prev_delay = delay
+
+        slot = self.keys % RING_SIZE
+        self.ring_planned[slot] = planned
+        self.ring_actual[slot] = actual
+        self.ring_latency[slot] = latency
+
+        self.keys += 1
+        if action == ACTION_BACKSPACE:
+            self.backspaces += 1
+            self._in_correction = True
+        elif action == ACTION_NAV:
+            self.moves += 1
+        else:
+            if action == ACTION_TYPO:
+                self.typos += len(key)
+            else:
+                self.typed += len(key)
+            if self._in_correction:
+                self.corrections += 1
+                self._in_correction = False
+
+        if self.callback and self.keys % self.callback_every == 0:
+            self.callback(self)
+
+    def observe_queue(self, size):
+        if size > self.queue_high_water:
+            self.queue_high_water = size
+
+    def record_backpressure(self, seconds):
+        self.backpressure_waits += 1
+        self.backpressure_seconds += seconds
+
+    def record_starvation(self, seconds):
+        self.starvation_waits += 1
+        self.starvation_seconds += seconds
+
+    def recent(self):
+        """Recent samples, oldest first, as a list of (planned, actual, latency)."""
+        n = min(self.keys, RING_SIZE)
+        start = self.keys - n
+        return [(self.ring_planned[i % RING_SIZE], self.ring_actual[i % RING_SIZE], self.ring_latency[i % RING_SIZE])
+                for i in range(start, self.keys)]
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return self.finished - self.started
+
+    @property
+    def achieved_wpm(self):
+        return (self.typed / 5) / (self.elapsed / 60) if self.elapsed > 0 else 0.0
+
+    def to_dict(self):
+        return {
+            'keys': self.keys,
+            'typed': self.typed,
+            'typos': self.typos,
+            'backspaces': self.backspaces,
+            'corrections': self.corrections,
+            'moves': self.moves,
+            'elapsed_seconds': self.elapsed,
+            'achieved_wpm': self.achieved_wpm,
+            'queue': {
+                'capacity': self.queue_capacity,
+                'high_water': self.queue_high_water,
+                'backpressure_waits': self.backpressure_waits,
+                'backpressure_seconds': self.backpressure_seconds,
+                'starvation_waits': self.starvation_waits,
+                'starvation_seconds': self.starvation_seconds,
+            },
+            'backend_latency_seconds': self.backend_latency.to_dict(),
+            'sleep_overshoot_seconds': self.sleep_overshoot.to_dict(),
+            'interval_error_seconds': self.interval_error.to_dict(),
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self, prefix='human_typer'):
+        """Prometheus text exposition format."""
+        lines = []
+        for name, value, help_text in (
+            ('keys_total', self.keys, 'Keys sent to the backend'),
+            ('typed_chars_total', self.typed, 'Correct characters typed'),
+            ('typo_chars_total', self.typos, 'Wrong characters typed'),
+            ('backspaces_total', self.backspaces, 'Backspaces pressed'),
+            ('corrections_total', self.corrections, 'Typos corrected'),
+            ('cursor_moves_total', self.moves, 'Cursor movement keys pressed'),
+            ('queue_backpressure_waits_total', self.backpressure_waits, 'Planner waits on a full event queue'),
+            ('queue_backpressure_seconds_total', self.backpressure_seconds, 'Time the planner spent blocked'),
+            ('queue_starvation_waits_total', self.starvation_waits, 'Injector waits on an empty event queue'),
+            ('queue_starvation_seconds_total', self.starvation_seconds, 'Time the injector spent starved'),
+        ):
+            lines += [f'# HELP {prefix}_{name} {help_text}', f'# TYPE {prefix}_{name} counter',
+                      f'{prefix}_{name} {value}']
+
+        for name, value, help_text in (
+            ('achieved_wpm', f'{self.achieved_wpm:.3f}', 'Achieved words per minute'),
+            ('queue_capacity', self.queue_capacity, 'Planner -> injector queue capacity in batches'),
+            ('queue_high_water', self.queue_high_water, 'Highest planner -> injector queue depth seen'),
+        ):
+            lines += [f'# HELP {prefix}_{name} {help_text}', f'# TYPE {prefix}_{name} gauge',
+                      f'{prefix}_{name} {value}']
+
+        for name, hist, help_text in (
+            ('backend_latency_seconds', self.backend_latency, 'Backend call latency'),
+            ('sleep_overshoot_seconds', self.sleep_overshoot, 'Lateness of each key vs its deadline'),
+            ('interval_error_seconds', self.interval_error, 'Absolute error of actual vs planned inter-key interval'),
+        ):
+            lines += [f'# HELP {prefix}_{name} {help_text}', f'# TYPE {prefix}_{name} histogram']
+            cumulative = 0
+            for bound, n in zip(hist.buckets + ('+Inf',), hist.counts):
+                cumulative += n
+                lines.append(f'{prefix}_{name}_bucket{{le="{bound}"}} {cumulative}')
+            lines += [f'{prefix}_{name}_sum {hist.sum}', f'{prefix}_{name}_count {hist.count}']
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write to path: Prometheus text for .prom / .txt, JSON otherwise."""
+        data = self.to_prometheus() if path.endswith(('.prom', '.txt')) else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(data)
+
+
+class LiveProgress:
+    """
+    Live progress of one run for a reader on another thread, e.g. a UI polling at its own frame rate.
+    The typing thread is the only writer and publishes each update as a single tuple
+    assignment, so readers sample without locks and never see a half-written update.
+    total: Correct characters this run will type, if known.
+    planned: Planned seconds of this run, if known (ETA from the plan instead of from the pace so far).
+    """
+
+    def __init__(self, total=None, planned=None):
+        self.total = total
+        self.planned = planned
+        self.state = (0, 0, 0.0, None)  # (typed, typos, elapsed, eta)
+
+    def update(self, typed, typos, elapsed, eta=None):
+        self.state = (typed, typos, elapsed, eta)
+
+    def sample(self):
+        """Snapshot as a dict; eta (seconds) and done (0-1) are None while unknown."""
+        typed, typos, elapsed, eta = self.state
+        if eta is None and self.total and typed:
+            eta = (self.total - typed) * elapsed / typed
+        return {
+            'typed': typed,
+            'typos': typos,
+            'elapsed': elapsed,
+            'wpm': (typed / 5) / (elapsed / 60) if elapsed > 0 else 0.0,
+            'eta': eta,
+            'done': min(1.0, typed / self.total) if self.total else None,
+        }